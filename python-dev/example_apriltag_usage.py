@@ -8,7 +8,7 @@ as specified in the problem statement.
 
 import numpy as np
 import cv2
-from vio import AprilTagDetector
+from vio import AprilTagDetector, Detections
 
 
 def example_basic_usage():
@@ -192,13 +192,12 @@ def example_pose_extraction():
     )
     
     # Simulate multiple detections
-    detections = [
-        {'tag_id': 10, 'translation': np.array([0.1, 0.2, 1.0]), 'rotation_matrix': np.eye(3)},
-        {'tag_id': 42, 'translation': np.array([0.3, 0.4, 1.5]), 'rotation_matrix': np.eye(3)},
-        {'tag_id': 99, 'translation': np.array([0.5, 0.6, 2.0]), 'rotation_matrix': np.eye(3)},
-    ]
+    detections = Detections.zeros(3)
+    detections.tag_ids[:] = [10, 42, 99]
+    detections.tvecs[:] = [[0.1, 0.2, 1.0], [0.3, 0.4, 1.5], [0.5, 0.6, 2.0]]
+    detections.Rmats[:] = np.eye(3)
     
-    print(f"Multiple tags detected: {[d['tag_id'] for d in detections]}")
+    print(f"Multiple tags detected: {detections.tag_ids.tolist()}")
     print()
     
     # Extract specific tag
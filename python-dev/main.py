@@ -7,10 +7,11 @@ performing AprilTag detection, IMU pre-integration, and EKF fusion to estimate
 the globally-referenced 3D pose.
 """
 
+import logging
 import numpy as np
 from scipy.spatial.transform import Rotation
 import time
-from typing import Optional
+from typing import Optional, Tuple
 
 try:
     import cv2
@@ -18,7 +19,12 @@ except ImportError:
     print("Warning: OpenCV not installed. Image visualization will be disabled.")
     cv2 = None
 
-from vio import AprilTagDetector, IMUProcessor, EKFFusionEngine
+from vio import (
+    AprilTagDetector, IMUProcessor, EKFFusionEngine,
+    quat_xyzw_to_wxyz, quat_wxyz_to_xyzw
+)
+
+logger = logging.getLogger(__name__)
 
 
 class VIOSystem:
@@ -71,8 +77,8 @@ class VIOSystem:
         self,
         image: np.ndarray,
         timestamp: float,
-        gyro_measurements: list,
-        accel_measurements: list,
+        gyro_measurements: Tuple[np.ndarray, np.ndarray],
+        accel_measurements: Tuple[np.ndarray, np.ndarray],
         visualize: bool = True
     ) -> Optional[dict]:
         """
@@ -84,10 +90,12 @@ class VIOSystem:
             Input image frame.
         timestamp : float
             Frame timestamp in seconds.
-        gyro_measurements : list
-            List of (timestamp, gyro_reading) tuples since last frame.
-        accel_measurements : list
-            List of (timestamp, accel_reading) tuples since last frame.
+        gyro_measurements : Tuple[np.ndarray, np.ndarray]
+            (timestamps, readings) arrays of gyro samples since last frame,
+            with shapes (K,) and (K, 3).
+        accel_measurements : Tuple[np.ndarray, np.ndarray]
+            (timestamps, readings) arrays of accel samples since last frame,
+            with shapes (K,) and (K, 3).
         visualize : bool, optional
             Whether to visualize detections. Default is True.
         
@@ -99,32 +107,35 @@ class VIOSystem:
         self.frame_count += 1
         
         # Step 1: IMU Prediction
-        if self.last_frame_time is not None and len(gyro_measurements) > 0:
-            # Get current orientation estimate
-            state = self.ekf.get_state()
-            current_rotation = state['orientation']
+        if self.last_frame_time is not None and len(gyro_measurements[0]) > 0:
+            # Current orientation estimate, in the IMU's [x, y, z, w] order
+            current_quat = quat_wxyz_to_xyzw(self.ekf.get_state_view()['quaternion'])
             
             # Pre-integrate IMU measurements
-            delta_pos, delta_vel, delta_rot = self.imu_processor.preintegrate(
-                gyro_measurements,
-                accel_measurements,
-                initial_rotation=current_rotation
+            delta_pos, delta_vel, delta_quat = self.imu_processor.preintegrate(
+                *gyro_measurements,
+                *accel_measurements,
+                initial_quat=current_quat
             )
             
             dt = timestamp - self.last_frame_time
             
             # EKF Prediction step
-            self.ekf.predict(delta_pos, delta_vel, delta_rot, dt)
+            self.ekf.predict(delta_pos, delta_vel, quat_xyzw_to_wxyz(delta_quat), dt)
             
-            print(f"Frame {self.frame_count}: IMU prediction - "
-                  f"Δpos: {np.linalg.norm(delta_pos):.3f}m, "
-                  f"Δvel: {np.linalg.norm(delta_vel):.3f}m/s")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Frame %d: IMU prediction - Δpos: %.3fm, Δvel: %.3fm/s",
+                    self.frame_count,
+                    np.linalg.norm(delta_pos),
+                    np.linalg.norm(delta_vel)
+                )
         
         # Step 2: AprilTag Detection
         detections = self.detector.detect(image)
         
         if len(detections) > 0:
-            print(f"  Detected {len(detections)} AprilTag(s)")
+            logger.debug("  Detected %d AprilTag(s)", len(detections))
             
             # Use the first detected tag for measurement update
             # In a real system, might use multiple tags or select best quality
@@ -136,7 +147,7 @@ class VIOSystem:
             # EKF Update step
             self.ekf.update(measured_position, measured_rotation)
             
-            print(f"  Tag {detection['tag_id']}: Updated pose estimate")
+            logger.debug("  Tag %d: Updated pose estimate", detection['tag_id'])
             
             # Visualize if requested
             if visualize and cv2 is not None:
@@ -144,17 +155,17 @@ class VIOSystem:
                 cv2.imshow('VIO System - AprilTag Detection', vis_image)
                 cv2.waitKey(1)
         else:
-            print(f"  No AprilTags detected - using IMU prediction only")
+            logger.debug("  No AprilTags detected - using IMU prediction only")
         
         # Get current state estimate
         state = self.ekf.get_state()
         position = state['position']
         uncertainty = self.ekf.get_position_uncertainty()
         
-        print(f"  Estimated pose: X={position[0]:.3f}m, "
-              f"Y={position[1]:.3f}m, Z={position[2]:.3f}m "
-              f"(±{uncertainty:.3f}m)")
-        print()
+        logger.debug(
+            "  Estimated pose: X=%.3fm, Y=%.3fm, Z=%.3fm (±%.3fm)",
+            position[0], position[1], position[2], uncertainty
+        )
         
         self.last_frame_time = timestamp
         
@@ -181,13 +192,19 @@ class VIOSystem:
         print("VIO System reset")
 
 
-def simulate_vio_system():
+def simulate_vio_system(slow: bool = False):
     """
     Simulate the VIO system with synthetic data.
     
     This function demonstrates the main application loop by generating
     synthetic AprilTag images and IMU data, then processing them through
     the VIO pipeline.
+    
+    Parameters
+    ----------
+    slow : bool, optional
+        Pause briefly after each frame so per-frame output is readable.
+        Default is False, which runs the pipeline at full speed.
     """
     print("=" * 60)
     print("Visual-Inertial Odometry Simulation")
@@ -239,40 +256,43 @@ def simulate_vio_system():
     frame_interval = 1.0 / fps
     imu_interval = 1.0 / imu_rate
     
+    # Generate synthetic grayscale image once (blank for demonstration)
+    # In a real system, request grayscale frames from the camera
+    image = np.full((image_height, image_width), 255, dtype=np.uint8)
+    
+    # IMU buffers reused for every frame period
+    rng = np.random.default_rng()
+    imu_samples = int(frame_interval / imu_interval)
+    imu_offsets = np.arange(imu_samples) * imu_interval - frame_interval
+    imu_ts = np.empty(imu_samples)
+    gyro_vals = np.empty((imu_samples, 3))
+    accel_vals = np.empty((imu_samples, 3))
+    
     for frame_idx in range(int(duration * fps)):
         timestamp = frame_idx * frame_interval
         
-        # Generate synthetic image (blank for demonstration)
-        # In a real system, capture from camera
-        image = np.ones((image_height, image_width, 3), dtype=np.uint8) * 255
-        
-        # Generate IMU data for this frame period
-        gyro_measurements = []
-        accel_measurements = []
-        
         # Simulate IMU samples between frames
-        imu_samples = int(frame_interval / imu_interval)
-        for i in range(imu_samples):
-            t = timestamp - frame_interval + i * imu_interval
-            
-            # Simulated IMU data (stationary with noise)
-            gyro = np.random.randn(3) * 0.01  # Small noise
-            accel = np.array([0, 0, 9.81]) + np.random.randn(3) * 0.1
-            
-            gyro_measurements.append((t, gyro))
-            accel_measurements.append((t, accel))
+        np.add(imu_offsets, timestamp, out=imu_ts)
+        
+        # Simulated IMU data (stationary with noise)
+        rng.standard_normal(out=gyro_vals)
+        gyro_vals *= 0.01  # Small noise
+        rng.standard_normal(out=accel_vals)
+        accel_vals *= 0.1
+        accel_vals[:, 2] += 9.81
         
         # Process frame
         result = vio.process_frame(
             image,
             timestamp,
-            gyro_measurements,
-            accel_measurements,
+            (imu_ts, gyro_vals),
+            (imu_ts, accel_vals),
             visualize=False  # Disable visualization for synthetic data
         )
         
         # Small delay to make output readable
-        time.sleep(0.1)
+        if slow:
+            time.sleep(0.1)
     
     print("=" * 60)
     print("Simulation complete!")
@@ -301,6 +321,8 @@ def main():
     if len(sys.argv) > 1 and sys.argv[1] == '--help':
         print("Usage:")
         print("  python main.py              Run simulation with synthetic data")
+        print("  python main.py --verbose    Log per-frame estimates")
+        print("  python main.py --slow       Pause after each frame")
         print("  python main.py --help       Show this help message")
         print()
         print("For real-world usage, modify the main() function to:")
@@ -309,8 +331,13 @@ def main():
         print("  - Use calibrated camera parameters")
         return
     
+    logging.basicConfig(
+        level=logging.DEBUG if '--verbose' in sys.argv else logging.INFO,
+        format='%(message)s'
+    )
+    
     # Run simulation
-    simulate_vio_system()
+    simulate_vio_system(slow='--slow' in sys.argv)
 
 
 if __name__ == '__main__':
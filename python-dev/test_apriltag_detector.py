@@ -8,6 +8,7 @@ according to the specification.
 
 import numpy as np
 import sys
+from types import SimpleNamespace
 
 try:
     import cv2
@@ -22,6 +23,50 @@ except ImportError:
     sys.exit(1)
 
 from vio import AprilTagDetector
+from vio.apriltag_detector import _dedupe_tags
+
+
+class BrightSquareDetector:
+    """
+    Stand-in for apriltag.Detector that reports the bright square in an image.
+    
+    The outer edges of the square are returned as the tag corners, in the
+    coordinates of the image passed in, and the shape of every image is
+    recorded. With ``duplicate=True`` the tag is reported a second time, one
+    pixel away and with a higher decision margin.
+    """
+    
+    def __init__(self, tag_id=3, duplicate=False):
+        self.tag_id = tag_id
+        self.duplicate = duplicate
+        self.shapes = []
+    
+    def detect(self, gray):
+        self.shapes.append(gray.shape)
+        ys, xs = np.nonzero(gray > 127)
+        if len(xs) == 0:
+            return []
+        x0, x1 = xs.min() - 0.5, xs.max() + 0.5
+        y0, y1 = ys.min() - 0.5, ys.max() + 0.5
+        corners = np.array([[x0, y1], [x1, y1], [x1, y0], [x0, y0]])
+        results = [SimpleNamespace(
+            tag_id=self.tag_id, center=corners.mean(axis=0), corners=corners,
+            hamming=0, decision_margin=50.0
+        )]
+        if self.duplicate:
+            shifted = corners + 1.0
+            results.append(SimpleNamespace(
+                tag_id=self.tag_id, center=shifted.mean(axis=0), corners=shifted,
+                hamming=0, decision_margin=80.0
+            ))
+        return results
+
+
+def square_image():
+    """Black 640x480 image with a white 40x40 square at x=300, y=200."""
+    image = np.zeros((480, 640), dtype=np.uint8)
+    image[200:240, 300:340] = 255
+    return image
 
 
 def test_initialization():
@@ -103,18 +148,12 @@ def test_object_points():
         print(f"✗ Points not in Z=0 plane")
         return False
     
-    # Check distances between consecutive points
-    distances = []
-    for i in range(4):
-        p1 = points[i]
-        p2 = points[(i + 1) % 4]
-        dist = np.linalg.norm(p2 - p1)
-        distances.append(dist)
+    # Check distances between consecutive points (closing the loop)
+    sides = np.linalg.norm(np.roll(points, -1, axis=0) - points, axis=1)
     
     # All sides should be approximately equal (forming a square)
-    if np.allclose(distances[0], distances[2], rtol=0.01) and \
-       np.allclose(distances[1], distances[3], rtol=0.01):
-        print(f"✓ Points form a square (side lengths: {distances[0]:.4f}m, {distances[1]:.4f}m)")
+    if np.allclose(sides, sides[0], rtol=0.01):
+        print(f"✓ Points form a square (side lengths: {sides[0]:.4f}m, {sides[1]:.4f}m)")
     else:
         print(f"✗ Points do not form a square properly")
         return False
@@ -159,18 +198,44 @@ def test_detect_method():
         print(f"✗ Detect failed with color image: {e}")
         return False
     
+    # Test rigid-target detection with blank image
+    try:
+        pose, standalone = detector.detect_rigid(
+            blank_gray, {0: detector.object_points}
+        )
+        if pose is None and len(standalone) == 0:
+            print(f"✓ detect_rigid returns no pose when no tags detected")
+        else:
+            print(f"✗ detect_rigid returned a pose for a blank image")
+            return False
+    except Exception as e:
+        print(f"✗ detect_rigid failed: {e}")
+        return False
+    
+    # Test batch detection; the worker pool is shut down on leaving the block
+    try:
+        with detector:
+            batch = detector.detect_batch([blank_gray, blank_color])
+        if len(batch) == 2 and all(len(d) == 0 for d in batch) and detector._pool is None:
+            print(f"✓ detect_batch works and close() shuts down its pool")
+        else:
+            print(f"✗ detect_batch returned unexpected results or left its pool running")
+            return False
+    except Exception as e:
+        print(f"✗ detect_batch failed: {e}")
+        return False
+    
     # Verify return format
     if len(detections) == 0:
-        print(f"✓ Returns empty list when no tags detected")
+        print(f"✓ Returns no detections when no tags detected")
     else:
-        # Check that detection dictionary has required fields
-        detection = detections[0]
+        # Check that detection records have required fields
         required_fields = ['tag_id', 'translation', 'rotation_vector', 'rotation_matrix']
-        missing_fields = [f for f in required_fields if f not in detection]
+        missing_fields = [f for f in required_fields if f not in detections[0]]
         if len(missing_fields) == 0:
-            print(f"✓ Detection dictionary has all required fields")
+            print(f"✓ Detection records have all required fields")
         else:
-            print(f"✗ Detection dictionary missing fields: {missing_fields}")
+            print(f"✗ Detection records missing fields: {missing_fields}")
             return False
     
     print()
@@ -257,6 +322,182 @@ def test_visualization():
         print(f"✗ visualize_detections failed: {e}")
         return False
     
+    # get_pose_from_tag_id accepts the same dictionary form
+    pose = detector.get_pose_from_tag_id([mock_detection], 0)
+    if (pose is not None and np.array_equal(pose[0], mock_detection['translation'])
+            and detector.get_pose_from_tag_id([mock_detection], 1) is None):
+        print(f"✓ get_pose_from_tag_id works with detection dictionaries")
+    else:
+        print(f"✗ get_pose_from_tag_id failed with detection dictionaries")
+        return False
+    
+    print()
+    return True
+
+
+def test_tracking_roi():
+    """Test that tracking searches a smaller window and rescans periodically."""
+    print("Test 6: Region-of-Interest Tracking")
+    print("-" * 60)
+    
+    detector = AprilTagDetector(
+        tag_size=0.19,
+        camera_matrix=AprilTagDetector.create_default_camera_matrix(640, 480),
+        dist_coeffs=np.zeros(5),
+        full_scan_period=3,
+        detector_factory=BrightSquareDetector
+    )
+    fake = detector.detector
+    image = square_image()
+    
+    centers = [detector.detect(image, use_tracking=True).centers for _ in range(6)]
+    full = [shape == image.shape for shape in fake.shapes]
+    
+    # Full scan, three tracked frames, then a full scan again
+    if full == [True, False, False, False, True, False]:
+        print(f"✓ Full scan every {detector._full_scan_period + 1} frames")
+    else:
+        print(f"✗ Unexpected scan pattern (full scans: {full})")
+        return False
+    
+    if all(fake.shapes[i][0] * fake.shapes[i][1] < 480 * 640 / 4 for i in (1, 2, 3)):
+        print(f"✓ Tracked frames search a smaller window ({fake.shapes[1]})")
+    else:
+        print(f"✗ Tracked window did not shrink ({fake.shapes[1]})")
+        return False
+    
+    # Detections from the window are reported in full-image coordinates
+    if all(len(c) == 1 and np.allclose(c[0], [319.5, 219.5]) for c in centers):
+        print(f"✓ Tracked detections are in full-image coordinates")
+    else:
+        print(f"✗ Tracked detections are offset: {centers}")
+        return False
+    
+    # Untracked calls in between must not shift the full-scan schedule
+    detector._last_bbox_per_id.clear()
+    fake.shapes.clear()
+    for use_tracking in (True, True, False, True, True, True, True):
+        detector.detect(image, use_tracking=use_tracking)
+    full = [shape == image.shape for shape in fake.shapes]
+    if full == [True, False, True, False, False, True, False]:
+        print(f"✓ Untracked detect() calls leave the tracking schedule alone")
+    else:
+        print(f"✗ Untracked detect() changed the scan pattern (full scans: {full})")
+        return False
+    
+    print()
+    return True
+
+
+def test_duplicate_tags():
+    """Test that near-identical detections of one tag are collapsed."""
+    print("Test 7: Duplicate Detections")
+    print("-" * 60)
+    
+    detector = AprilTagDetector(
+        tag_size=0.19,
+        camera_matrix=AprilTagDetector.create_default_camera_matrix(640, 480),
+        dist_coeffs=np.zeros(5),
+        detector_factory=lambda: BrightSquareDetector(duplicate=True)
+    )
+    
+    detections = detector.detect(square_image())
+    if len(detections) == 1 and detections.decision_margins[0] == 80.0:
+        print(f"✓ Duplicates collapsed to the highest-margin detection")
+    else:
+        print(f"✗ Expected one detection with margin 80, got "
+              f"{detections.decision_margins.tolist()}")
+        return False
+    
+    # Two detections of the same ID far apart are different markers
+    result = SimpleNamespace(decision_margin=50.0)
+    tags = [
+        (3, np.array([100.0, 100.0]), np.zeros((4, 2)), result),
+        (3, np.array([300.0, 100.0]), np.zeros((4, 2)), result),
+    ]
+    if len(_dedupe_tags(tags)) == 2:
+        print(f"✓ Distant detections of one ID are kept")
+    else:
+        print(f"✗ Distant detections of one ID were merged")
+        return False
+    
+    print()
+    return True
+
+
+def test_downscale():
+    """Test that corners found on a downscaled image map back to full resolution."""
+    print("Test 8: Downscaled Detection")
+    print("-" * 60)
+    
+    camera_matrix = AprilTagDetector.create_default_camera_matrix(640, 480)
+    image = square_image()
+    expected = np.array([[299.5, 239.5], [339.5, 239.5], [339.5, 199.5], [299.5, 199.5]])
+    
+    for downscale in (1.0, 2.0, 4.0):
+        detector = AprilTagDetector(
+            tag_size=0.19,
+            camera_matrix=camera_matrix,
+            dist_coeffs=np.zeros(5),
+            downscale=downscale,
+            detector_factory=BrightSquareDetector
+        )
+        fake = detector.detector
+        detections = detector.detect(image)
+        
+        searched = fake.shapes[0]
+        if searched != (480 // int(downscale), 640 // int(downscale)):
+            print(f"✗ Detector searched a {searched} image at downscale {downscale}")
+            return False
+        if len(detections) == 1 and np.allclose(detections.corners[0], expected):
+            print(f"✓ Corners in full-resolution pixels at downscale {downscale}")
+        else:
+            print(f"✗ Corners not mapped back at downscale {downscale}: "
+                  f"{detections.corners.tolist()}")
+            return False
+    
+    print()
+    return True
+
+
+def test_detector_factory():
+    """Test that a custom detector factory is used, once per batch worker."""
+    print("Test 9: Detector Factory")
+    print("-" * 60)
+    
+    created = []
+    
+    def factory():
+        created.append(BrightSquareDetector(tag_id=7))
+        return created[-1]
+    
+    detector = AprilTagDetector(
+        tag_size=0.19,
+        camera_matrix=AprilTagDetector.create_default_camera_matrix(640, 480),
+        dist_coeffs=np.zeros(5),
+        nthreads=2,
+        detector_factory=factory
+    )
+    
+    detections = detector.detect(square_image())
+    if detector.detector is created[0] and detections.tag_ids.tolist() == [7]:
+        print(f"✓ detect() uses the factory's detector")
+    else:
+        print(f"✗ detect() did not use the factory's detector")
+        return False
+    
+    with detector:
+        batch = detector.detect_batch([square_image()] * 4)
+    workers = created[1:]
+    if (all(d.tag_ids.tolist() == [7] for d in batch)
+            and 1 <= len(workers) <= 2
+            and sum(len(w.shapes) for w in workers) == 4
+            and len(created[0].shapes) == 1):
+        print(f"✓ detect_batch() workers each got their own detector ({len(workers)})")
+    else:
+        print(f"✗ detect_batch() did not use per-worker detectors")
+        return False
+    
     print()
     return True
 
@@ -274,6 +515,10 @@ def main():
         test_detect_method,
         test_camera_matrix_helper,
         test_visualization,
+        test_tracking_roi,
+        test_duplicate_tags,
+        test_downscale,
+        test_detector_factory,
     ]
     
     results = []
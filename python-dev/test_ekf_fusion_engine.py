@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Test script for EKFFusionEngine validation.
+
+This script checks the specialized numeric paths of the EKFFusionEngine
+against their general matrix forms.
+"""
+
+import numpy as np
+import sys
+
+from vio import EKFFusionEngine
+
+
+def test_covariance_propagation():
+    """Test that predict propagates P as F P F^T + Q dt."""
+    print("Test 1: Covariance Propagation")
+    print("-" * 60)
+    
+    rng = np.random.default_rng(0)
+    A = rng.normal(size=(16, 16))
+    P = A @ A.T + np.eye(16)
+    B = rng.normal(size=(16, 16)) * 0.1
+    dt = 0.033
+    
+    # Default (diagonal) process noise and a full one
+    for name, Q in (("diagonal Q", None), ("full Q", B @ B.T)):
+        ekf = EKFFusionEngine(initial_covariance=P, process_noise=Q)
+        ekf.predict(np.zeros(3), np.zeros(3), np.array([1.0, 0.0, 0.0, 0.0]), dt)
+        
+        F = ekf._compute_state_transition_matrix(dt)
+        expected = F @ P @ F.T + ekf.Q * dt
+        
+        if np.allclose(ekf.covariance, expected, rtol=1e-12, atol=1e-12):
+            print(f"✓ Covariance matches F P F^T + Q dt ({name})")
+        else:
+            error = np.abs(ekf.covariance - expected).max()
+            print(f"✗ Covariance differs from F P F^T + Q dt ({name}, max error {error:.3e})")
+            return False
+    
+    # A reassigned covariance need not be C-contiguous
+    strided = np.zeros((32, 32))
+    strided[::2, ::2] = P
+    for name, cov in (("Fortran-ordered P", np.asfortranarray(P)),
+                      ("strided P", strided[::2, ::2])):
+        ekf = EKFFusionEngine()
+        ekf.covariance = cov
+        ekf.predict(np.zeros(3), np.zeros(3), np.array([1.0, 0.0, 0.0, 0.0]), dt)
+        
+        F = ekf._compute_state_transition_matrix(dt)
+        expected = F @ P @ F.T + ekf.Q * dt
+        
+        if np.allclose(ekf.covariance, expected, rtol=1e-12, atol=1e-12):
+            print(f"✓ Covariance matches F P F^T + Q dt ({name})")
+        else:
+            error = np.abs(ekf.covariance - expected).max()
+            print(f"✗ Covariance differs from F P F^T + Q dt ({name}, max error {error:.3e})")
+            return False
+    
+    print()
+    return True
+
+
+def test_batch_matches_sequential():
+    """Test that predict_batch/update_batch match per-step calls."""
+    print("Test 2: Batch Steps")
+    print("-" * 60)
+    
+    rng = np.random.default_rng(1)
+    n = 50
+    delta_positions = rng.normal(size=(n, 3)) * 0.01
+    delta_velocities = rng.normal(size=(n, 3)) * 0.01
+    delta_quats = np.hstack([np.ones((n, 1)), rng.normal(size=(n, 3)) * 0.02])
+    delta_quats /= np.linalg.norm(delta_quats, axis=1, keepdims=True)
+    dts = rng.uniform(0.005, 0.02, size=n)
+    positions = rng.normal(size=(n, 3))
+    quats = rng.normal(size=(n, 4))
+    quats /= np.linalg.norm(quats, axis=1, keepdims=True)
+    
+    batched = EKFFusionEngine()
+    for k in range(0, n, 10):
+        batched.predict_batch(delta_positions[k:k + 10], delta_velocities[k:k + 10],
+                              delta_quats[k:k + 10], dts[k:k + 10])
+        batched.update_batch(positions[k:k + 10], quats[k:k + 10])
+    
+    # Same order of steps: 10 predicts, then 10 updates
+    sequential = EKFFusionEngine()
+    for k in range(0, n, 10):
+        for j in range(k, k + 10):
+            sequential.predict(delta_positions[j], delta_velocities[j], delta_quats[j], dts[j])
+        for j in range(k, k + 10):
+            sequential.update(positions[j], quats[j])
+    
+    if (np.allclose(batched.state, sequential.state, rtol=1e-12, atol=1e-12)
+            and np.allclose(batched.covariance, sequential.covariance, rtol=1e-12, atol=1e-12)):
+        print(f"✓ Batched steps match per-step calls")
+    else:
+        print(f"✗ Batched steps differ from per-step calls")
+        return False
+    
+    print()
+    return True
+
+
+def test_process_noise_changes():
+    """Test that predict uses Q after it is edited in place or reassigned."""
+    print("Test 3: Process Noise Changes")
+    print("-" * 60)
+    
+    dt = 0.02
+    ekf = EKFFusionEngine()
+    
+    def check(name):
+        P = ekf.covariance.copy()
+        ekf.predict(np.zeros(3), np.zeros(3), np.array([1.0, 0.0, 0.0, 0.0]), dt)
+        F = ekf._compute_state_transition_matrix(dt)
+        expected = F @ P @ F.T + ekf.Q * dt
+        if np.allclose(ekf.covariance, expected, rtol=1e-12, atol=1e-12):
+            print(f"✓ Predict uses the current Q ({name})")
+            return True
+        print(f"✗ Predict uses a stale Q ({name})")
+        return False
+    
+    if not check("initial Q"):
+        return False
+    
+    ekf.Q[0, 0] *= 10.0
+    if not check("diagonal edited in place"):
+        return False
+    
+    # A diagonal Q that gains off-diagonal terms must leave the diagonal path
+    ekf.Q[0, 3] = ekf.Q[3, 0] = 0.002
+    if not check("off-diagonal edited in place"):
+        return False
+    
+    ekf.Q = np.eye(16) * 0.05
+    if not check("new Q assigned"):
+        return False
+    
+    print()
+    return True
+
+
+def run_filter(ekf, steps=30, seed=2):
+    """Apply a fixed sequence of predict/update steps to ``ekf``."""
+    rng = np.random.default_rng(seed)
+    for _ in range(steps):
+        delta_quat = np.append(1.0, rng.normal(size=3) * 0.02)
+        ekf.predict(rng.normal(size=3) * 0.01, rng.normal(size=3) * 0.01,
+                    delta_quat / np.linalg.norm(delta_quat), 0.01)
+        quat = np.append(1.0, rng.normal(size=3) * 0.05)
+        ekf.update(rng.normal(size=3) * 0.1, quat / np.linalg.norm(quat))
+    return ekf
+
+
+def test_joseph_form():
+    """Test that the Joseph-form update matches the standard one."""
+    print("Test 4: Joseph Form Update")
+    print("-" * 60)
+    
+    standard = run_filter(EKFFusionEngine())
+    joseph = run_filter(EKFFusionEngine(joseph_form=True))
+    
+    if (np.allclose(joseph.state, standard.state, rtol=1e-9, atol=1e-12)
+            and np.allclose(joseph.covariance, standard.covariance, rtol=1e-9, atol=1e-12)):
+        print(f"✓ Joseph form matches the standard update")
+    else:
+        error = np.abs(joseph.covariance - standard.covariance).max()
+        print(f"✗ Joseph form differs from the standard update (max error {error:.3e})")
+        return False
+    
+    if np.array_equal(joseph.covariance, joseph.covariance.T):
+        print(f"✓ Joseph-form covariance is symmetric")
+    else:
+        print(f"✗ Joseph-form covariance is not symmetric")
+        return False
+    
+    print()
+    return True
+
+
+def test_single_precision():
+    """Test that a float32 filter tracks the float64 one."""
+    print("Test 5: Single Precision")
+    print("-" * 60)
+    
+    double = run_filter(EKFFusionEngine())
+    single = run_filter(EKFFusionEngine(dtype=np.float32))
+    
+    if single.state.dtype != np.float32 or single.covariance.dtype != np.float32:
+        print(f"✗ float32 filter stores {single.state.dtype} state")
+        return False
+    
+    if (np.allclose(single.state, double.state, rtol=1e-5, atol=1e-6)
+            and np.allclose(single.covariance, double.covariance, rtol=1e-5, atol=1e-6)):
+        print(f"✓ float32 filter matches float64 within 1e-5")
+    else:
+        error = max(np.abs(single.state - double.state).max(),
+                    np.abs(single.covariance - double.covariance).max())
+        print(f"✗ float32 filter differs from float64 (max error {error:.3e})")
+        return False
+    
+    # The quaternion is normalized in float64 before being stored, so its
+    # norm is off by at most the rounding of the float32 components (half an
+    # ulp); normalizing in float32 arithmetic roughly doubles that
+    rng = np.random.default_rng(3)
+    ekf = EKFFusionEngine(dtype=np.float32)
+    tolerance = 2.0 ** -24
+    worst = 0.0
+    for _ in range(2000):
+        delta_quat = np.append(1.0, rng.normal(size=3) * 0.05)
+        ekf.predict(np.zeros(3), np.zeros(3), delta_quat / np.linalg.norm(delta_quat), 0.01)
+        norm = np.linalg.norm(ekf.state[6:10].astype(np.float64))
+        worst = max(worst, abs(norm - 1.0))
+    if worst <= tolerance:
+        print(f"✓ float32 quaternion stays unit norm to {worst:.1e} (< {tolerance:.1e})")
+    else:
+        print(f"✗ float32 quaternion norm drifts by {worst:.1e} (> {tolerance:.1e})")
+        return False
+    
+    print()
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("EKFFusionEngine Validation Tests")
+    print("=" * 60)
+    print()
+    
+    tests = [
+        test_covariance_propagation,
+        test_batch_matches_sequential,
+        test_process_noise_changes,
+        test_joseph_form,
+        test_single_precision,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            result = test()
+            results.append(result)
+        except Exception as e:
+            print(f"✗ Test raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append(False)
+    
+    print("=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+    passed = sum(results)
+    total = len(results)
+    print(f"Passed: {passed}/{total}")
+    
+    if passed == total:
+        print("\n✓ All tests passed! EKFFusionEngine is working correctly.")
+        return 0
+    else:
+        print(f"\n✗ {total - passed} test(s) failed.")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,9 +11,12 @@ Components:
     - EKFFusionEngine: Fuses IMU and visual data using an Extended Kalman Filter
 """
 
-from .apriltag_detector import AprilTagDetector
+from .apriltag_detector import AprilTagDetector, Detections
 from .imu_processor import IMUProcessor
-from .ekf_fusion_engine import EKFFusionEngine
+from .ekf_fusion_engine import EKFFusionEngine, quat_xyzw_to_wxyz, quat_wxyz_to_xyzw
 
 __version__ = '0.1.0'
-__all__ = ['AprilTagDetector', 'IMUProcessor', 'EKFFusionEngine']
+__all__ = [
+    'AprilTagDetector', 'Detections', 'IMUProcessor', 'EKFFusionEngine',
+    'quat_xyzw_to_wxyz', 'quat_wxyz_to_xyzw',
+]
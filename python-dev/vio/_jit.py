@@ -0,0 +1,19 @@
+"""
+Optional Numba JIT Support
+
+This module exposes ``njit`` from Numba when it is installed. Otherwise a
+no-op decorator with the same call signatures is provided, so jitted kernels
+remain importable (and callable as plain Python) without Numba.
+"""
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit`` when Numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
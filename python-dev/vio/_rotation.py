@@ -0,0 +1,18 @@
+"""
+Lazy Access to scipy's Rotation
+
+Importing ``scipy.spatial`` accounts for a large share of the package import
+time, while the filter and pre-integration paths work on raw quaternions. The
+``Rotation`` class is therefore imported on first use and cached here.
+"""
+
+_Rotation = None
+
+
+def rotation_cls():
+    """Return ``scipy.spatial.transform.Rotation``, importing it on first use."""
+    global _Rotation
+    if _Rotation is None:
+        from scipy.spatial.transform import Rotation
+        _Rotation = Rotation
+    return _Rotation
@@ -0,0 +1,107 @@
+/*
+ * Native IMU pre-integration kernel.
+ *
+ * C port of ``_preintegrate_kernel`` in imu_processor.py, built into the
+ * optional ``vio._vio`` extension by ``_vio_build.py``. Inputs are the
+ * float32 arrays produced by ``IMUProcessor.preintegrate`` after merging the
+ * gyroscope and accelerometer streams onto a common timeline; accumulation
+ * is done in double precision, matching the Numba kernel.
+ *
+ * Quaternions are [x, y, z, w] (scalar-last).
+ */
+
+#include <math.h>
+
+#if defined(__GNUC__) || defined(__clang__)
+#define VIO_INLINE static inline __attribute__((always_inline))
+#else
+#define VIO_INLINE static inline
+#endif
+
+/* Hamilton product r = q * p */
+VIO_INLINE void quat_multiply(const double q[4], const double p[4], double r[4])
+{
+    double x = q[3] * p[0] + q[0] * p[3] + q[1] * p[2] - q[2] * p[1];
+    double y = q[3] * p[1] - q[0] * p[2] + q[1] * p[3] + q[2] * p[0];
+    double z = q[3] * p[2] + q[0] * p[1] - q[1] * p[0] + q[2] * p[3];
+    double w = q[3] * p[3] - q[0] * p[0] - q[1] * p[1] - q[2] * p[2];
+    r[0] = x;
+    r[1] = y;
+    r[2] = z;
+    r[3] = w;
+}
+
+/* r = q v q^-1 for a unit quaternion q, via t = 2 u x v; v + w t + u x t */
+VIO_INLINE void quat_rotate(const double q[4], const double v[3], double r[3])
+{
+    double tx = 2.0 * (q[1] * v[2] - q[2] * v[1]);
+    double ty = 2.0 * (q[2] * v[0] - q[0] * v[2]);
+    double tz = 2.0 * (q[0] * v[1] - q[1] * v[0]);
+    r[0] = v[0] + q[3] * tx + (q[1] * tz - q[2] * ty);
+    r[1] = v[1] + q[3] * ty + (q[2] * tx - q[0] * tz);
+    r[2] = v[2] + q[3] * tz + (q[0] * ty - q[1] * tx);
+}
+
+void preintegrate_batch(
+    const float *dt, const float *gyro, const float *accel, long n,
+    const float *gyro_bias, const float *accel_bias, const float *gravity,
+    const float *q0,
+    double *out_dp, double *out_dv, double *out_q)
+{
+    const double qi[4] = {q0[0], q0[1], q0[2], q0[3]};
+    double q_delta[4] = {0.0, 0.0, 0.0, 1.0};
+    double q[4] = {qi[0], qi[1], qi[2], qi[3]};
+    double dp[3] = {0.0, 0.0, 0.0};
+    double dv[3] = {0.0, 0.0, 0.0};
+    long k;
+    int i;
+
+    for (k = 0; k < n; ++k) {
+        const double h = dt[k];
+        double r[3], p[4], mid[4], v[3], a[3];
+        double angle, s, inv_norm;
+
+        /* Incremental rotation exp(omega * dt) as a quaternion */
+        for (i = 0; i < 3; ++i)
+            r[i] = (gyro[3 * k + i] - gyro_bias[i]) * h;
+        angle = sqrt(r[0] * r[0] + r[1] * r[1] + r[2] * r[2]);
+        s = angle < 1e-8 ? 0.5 - angle * angle / 48.0 : sin(0.5 * angle) / angle;
+        p[0] = r[0] * s;
+        p[1] = r[1] * s;
+        p[2] = r[2] * s;
+        p[3] = cos(0.5 * angle);
+
+        /* q_delta = q_delta * p; world orientation q = q0 * q_delta */
+        quat_multiply(q_delta, p, q_delta);
+        for (i = 0; i < 4; ++i)
+            mid[i] = q[i];
+        quat_multiply(qi, q_delta, q);
+
+        /* Midpoint orientation normalize(q_prev + q) */
+        for (i = 0; i < 4; ++i)
+            mid[i] += q[i];
+        inv_norm = 1.0 / sqrt(mid[0] * mid[0] + mid[1] * mid[1] +
+                              mid[2] * mid[2] + mid[3] * mid[3]);
+        for (i = 0; i < 4; ++i)
+            mid[i] *= inv_norm;
+
+        /* Rotate bias-corrected acceleration to world frame */
+        for (i = 0; i < 3; ++i)
+            v[i] = accel[3 * k + i] - accel_bias[i];
+        quat_rotate(mid, v, a);
+
+        for (i = 0; i < 3; ++i) {
+            a[i] -= gravity[i];
+            /* Position from the velocity at the start of the step */
+            dp[i] += dv[i] * h + 0.5 * a[i] * h * h;
+            dv[i] += a[i] * h;
+        }
+    }
+
+    for (i = 0; i < 3; ++i) {
+        out_dp[i] = dp[i];
+        out_dv[i] = dv[i];
+    }
+    for (i = 0; i < 4; ++i)
+        out_q[i] = q_delta[i];
+}
@@ -0,0 +1,50 @@
+"""
+Build Script for the Optional Native Kernels
+
+Compiles ``_vio.c`` into the ``vio._vio`` extension module with cffi:
+
+    python vio/_vio_build.py
+
+The extension is optional; without it ``IMUProcessor`` uses the Numba kernel
+or the NumPy implementation. Set ``VIO_NATIVE_ARCH=1`` to compile with
+``-march=native`` for a build that only needs to run on the current machine.
+"""
+
+import os
+import shutil
+import tempfile
+
+from cffi import FFI
+
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+_CDEF = """
+void preintegrate_batch(
+    const float *dt, const float *gyro, const float *accel, long n,
+    const float *gyro_bias, const float *accel_bias, const float *gravity,
+    const float *q0,
+    double *out_dp, double *out_dv, double *out_q);
+"""
+
+_COMPILE_ARGS = ["-O3"]
+if os.environ.get("VIO_NATIVE_ARCH") == "1":
+    _COMPILE_ARGS.append("-march=native")
+
+ffibuilder = FFI()
+ffibuilder.cdef(_CDEF)
+ffibuilder.set_source(
+    "vio._vio",
+    _CDEF,
+    sources=[os.path.join(_HERE, "_vio.c")],
+    extra_compile_args=_COMPILE_ARGS,
+    libraries=[] if os.name == "nt" else ["m"],
+)
+
+
+if __name__ == "__main__":
+    # Build out of tree (cffi's generated wrapper is also named _vio.c) and
+    # copy the shared library next to this file
+    with tempfile.TemporaryDirectory() as build_dir:
+        library = ffibuilder.compile(tmpdir=build_dir, verbose=True)
+        shutil.copy(library, _HERE)
@@ -5,8 +5,15 @@ This module provides the AprilTagDetector class for detecting AprilTags in image
 and estimating their 3D pose using Perspective-n-Point (PnP) algorithm.
 """
 
+import dataclasses
+import functools
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 import numpy as np
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Union, Callable
 
 try:
     import cv2
@@ -18,6 +25,146 @@ try:
 except ImportError:
     apriltag = None
 
+# Identity rotation/translation for projecting points already in camera frame
+_ZERO_VEC = np.zeros(3)
+
+# Per-detection dictionary keys and the Detections columns they read from
+_DETECTION_KEYS = (
+    ('tag_id', 'tag_ids'),
+    ('center', 'centers'),
+    ('corners', 'corners'),
+    ('translation', 'tvecs'),
+    ('rotation_matrix', 'Rmats'),
+    ('rotation_vector', 'rvecs'),
+    ('hamming', 'hamming'),
+    ('decision_margin', 'decision_margins'),
+    ('reprojection_error', 'reproj_errors'),
+    ('alt_translation', 'alt_tvecs'),
+    ('alt_rotation_vector', 'alt_rvecs'),
+    ('alt_reprojection_error', 'alt_reproj_errors'),
+    ('corners_i32', 'corners_i32'),
+    ('center_i32', 'centers_i32'),
+)
+
+
+@dataclass
+class Detections:
+    """
+    AprilTag detections stored as one contiguous array per field.
+    
+    Row i of every array describes the i-th detected tag, so downstream code
+    can operate on all tags at once (e.g. ``detections.tvecs[:, 2]``).
+    Indexing with an integer returns the legacy per-detection dictionary and
+    iterating yields those dictionaries in order; indexing with a slice or
+    an index/mask array returns a new ``Detections``.
+    
+    Attributes
+    ----------
+    tag_ids : np.ndarray
+        Tag identifiers, shape (N,), int32.
+    centers : np.ndarray
+        Tag centers in pixels, shape (N, 2).
+    corners : np.ndarray
+        Tag corners in pixels, shape (N, 4, 2), float32.
+    tvecs : np.ndarray
+        Translation vectors (tx, ty, tz), shape (N, 3).
+    rvecs : np.ndarray
+        Rotation vectors (Rodrigues), shape (N, 3).
+    Rmats : np.ndarray
+        Rotation matrices, shape (N, 3, 3).
+    hamming : np.ndarray
+        Number of corrected bits (lower is better), shape (N,), int16.
+    decision_margins : np.ndarray
+        Decoding confidence, shape (N,), float32.
+    reproj_errors : np.ndarray
+        RMS reprojection error of the chosen pose in pixels, shape (N,).
+    alt_tvecs : np.ndarray
+        Translation of the other IPPE solution, shape (N, 3). NaN if the
+        solver returned a single solution.
+    alt_rvecs : np.ndarray
+        Rotation vector of the other IPPE solution, shape (N, 3).
+    alt_reproj_errors : np.ndarray
+        RMS reprojection error of the other IPPE solution, shape (N,).
+    corners_i32 : np.ndarray
+        ``corners`` rounded to integer pixels for drawing, shape (N, 4, 2).
+    centers_i32 : np.ndarray
+        ``centers`` rounded to integer pixels for drawing, shape (N, 2).
+    """
+    
+    tag_ids: np.ndarray
+    centers: np.ndarray
+    corners: np.ndarray
+    tvecs: np.ndarray
+    rvecs: np.ndarray
+    Rmats: np.ndarray
+    hamming: np.ndarray
+    decision_margins: np.ndarray
+    reproj_errors: np.ndarray
+    alt_tvecs: np.ndarray
+    alt_rvecs: np.ndarray
+    alt_reproj_errors: np.ndarray
+    corners_i32: np.ndarray
+    centers_i32: np.ndarray
+    _id_index: Optional[Dict[int, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    @classmethod
+    def zeros(cls, n: int) -> 'Detections':
+        """Allocate zero-filled arrays for ``n`` detections."""
+        return cls(
+            tag_ids=np.zeros(n, dtype=np.int32),
+            centers=np.zeros((n, 2)),
+            corners=np.zeros((n, 4, 2), dtype=np.float32),
+            tvecs=np.zeros((n, 3)),
+            rvecs=np.zeros((n, 3)),
+            Rmats=np.zeros((n, 3, 3)),
+            hamming=np.zeros(n, dtype=np.int16),
+            decision_margins=np.zeros(n, dtype=np.float32),
+            reproj_errors=np.zeros(n),
+            alt_tvecs=np.full((n, 3), np.nan),
+            alt_rvecs=np.full((n, 3), np.nan),
+            alt_reproj_errors=np.full(n, np.nan),
+            corners_i32=np.zeros((n, 4, 2), dtype=np.int32),
+            centers_i32=np.zeros((n, 2), dtype=np.int32),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.tag_ids)
+    
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if not -len(self) <= index < len(self):
+                raise IndexError("detection index out of range")
+            return {
+                key: getattr(self, field)[index]
+                for key, field in _DETECTION_KEYS
+            }
+        return Detections(*(
+            getattr(self, f.name)[index] for f in dataclasses.fields(self) if f.init
+        ))
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+    
+    def index_of(self, tag_id: int) -> Optional[int]:
+        """
+        Return the row of the first detection of ``tag_id``, or None.
+        
+        The ID-to-row map is built on the first lookup and reused afterwards,
+        so ``tag_ids`` should not be modified once lookups have started.
+        """
+        if self._id_index is None:
+            self._id_index = {}
+            for i, detected_id in enumerate(self.tag_ids.tolist()):
+                self._id_index.setdefault(detected_id, i)
+        return self._id_index.get(int(tag_id))
+    
+    def as_dict_list(self) -> List[Dict[str, Any]]:
+        """Return the detections as a list of per-detection dictionaries."""
+        return list(self)
+
 
 class AprilTagDetector:
     """
@@ -39,17 +186,54 @@ class AprilTagDetector:
     tag_family : str, optional
         AprilTag family to detect. Default is 'tagStandard41h12'.
         Other options: 'tag36h11', 'tag25h9', 'tag16h5', etc.
+    quad_decimate : float, optional
+        Decimation factor applied by the detector before quad detection.
+        Higher values are faster but reduce the detection range. Default is 2.0.
+    nthreads : int, optional
+        Number of detector threads, also used as the number of detect_batch()
+        workers. Default is ``os.cpu_count()``.
+    min_white_black_diff : int, optional
+        Minimum intensity difference between the white and black regions of a
+        quad. Forwarded to the detector when the apriltag binding exposes it.
+        Default is 20.
+    downscale : float, optional
+        Factor by which the image is shrunk with ``cv2.resize`` before
+        detection. Corners are mapped back to full resolution before PnP.
+        Default is 1.0 (no resizing).
+    full_scan_period : int, optional
+        With ``detect(..., use_tracking=True)``, the number of consecutive
+        frames searched only around the previous detections before the whole
+        image is scanned again. Default is 10.
+    detector_factory : callable, optional
+        Zero-argument callable returning a tag detector to use instead of
+        ``apriltag.Detector``, e.g. a wrapper around a GPU implementation.
+        The detector must provide the ``apriltag`` interface: ``detect(gray)``
+        on a 2D uint8 image, returning results with ``tag_id``, ``center``,
+        ``corners`` (4x2, pixels), ``hamming`` and ``decision_margin``. It is
+        called once for ``detector`` and once per detect_batch() worker, so
+        detectors need not be thread-safe. When given, tag_family,
+        quad_decimate, nthreads (except as the worker count) and
+        min_white_black_diff are not used. Default is None.
+    grayscale_mode : str, optional
+        How color images are reduced to grayscale: 'bt601' for the weighted
+        BGR sum of ``cv2.cvtColor`` (default), or 'green' to use the green
+        channel as a cheaper luma proxy.
     
     Attributes
     ----------
     tag_size : float
         Physical size of the AprilTag in meters.
     camera_matrix : np.ndarray
-        Camera intrinsic matrix.
+        Camera intrinsic matrix (contiguous float64).
     dist_coeffs : np.ndarray
         Camera distortion coefficients.
     detector : apriltag.Detector
-        AprilTag detector instance.
+        AprilTag detector instance owned by this object, or the detector
+        returned by ``detector_factory``.
+    downscale : float
+        Pre-detection downscaling factor.
+    nthreads : int
+        Number of detector threads, and of detect_batch() workers.
     """
     
     def __init__(
@@ -57,10 +241,21 @@ class AprilTagDetector:
         tag_size: float,
         camera_matrix: np.ndarray,
         dist_coeffs: np.ndarray,
-        tag_family: str = 'tagStandard41h12'
+        tag_family: str = 'tagStandard41h12',
+        quad_decimate: float = 2.0,
+        nthreads: Optional[int] = None,
+        min_white_black_diff: int = 20,
+        downscale: float = 1.0,
+        full_scan_period: int = 10,
+        grayscale_mode: str = 'bt601',
+        detector_factory: Optional[Callable[[], Any]] = None
     ):
         """Initialize the AprilTag detector with camera calibration parameters."""
-        if apriltag is None:
+        if grayscale_mode not in ('bt601', 'green'):
+            raise ValueError(
+                f"Unknown grayscale_mode {grayscale_mode!r}; expected 'bt601' or 'green'"
+            )
+        if detector_factory is None and apriltag is None:
             raise ImportError(
                 "apriltag library not found. Install it with: pip install apriltag"
             )
@@ -70,42 +265,98 @@ class AprilTagDetector:
             )
         
         self.tag_size = tag_size
-        self.camera_matrix = camera_matrix
+        # Stored as contiguous float64, the type OpenCV's solvers work in, so
+        # solvePnP does not convert it on every call
+        self.camera_matrix = np.ascontiguousarray(camera_matrix, dtype=np.float64)
         self.dist_coeffs = dist_coeffs
+        self.downscale = float(downscale)
+        self.grayscale_mode = grayscale_mode
+        
+        # Region-of-interest tracking state used by detect(use_tracking=True)
+        self._full_scan_period = int(full_scan_period)
+        self._last_bbox_per_id: Dict[int, Tuple[float, float, float, float]] = {}
+        self._frames_since_full_scan = 0
         
-        # Initialize AprilTag detector
-        options = apriltag.DetectorOptions(families=tag_family)
-        self.detector = apriltag.Detector(options)
-        
-        # Define 3D coordinates of tag corners in tag's coordinate system
-        # Tag is centered at origin, lying in XY plane
-        half_size = tag_size / 2.0
-        self.object_points = np.array([
-            [-half_size, -half_size, 0],  # Bottom-left
-            [ half_size, -half_size, 0],  # Bottom-right
-            [ half_size,  half_size, 0],  # Top-right
-            [-half_size,  half_size, 0],  # Top-left
+        # Initialize AprilTag detector. The C detector keeps per-call scratch
+        # state and is not thread-safe, so every instance owns its own
+        self.nthreads = int(nthreads or os.cpu_count() or 1)
+        if detector_factory is not None:
+            self.detector = detector_factory()
+        else:
+            self.detector = _make_detector(
+                tag_family,
+                float(quad_decimate),
+                self.nthreads,
+                int(min_white_black_diff)
+            )
+        
+        # Worker pool for detect_batch(), created on first use with nthreads
+        # workers. Detectors are not assumed reentrant, so each worker gets
+        # its own (single-threaded for apriltag; parallelism comes from
+        # running frames concurrently)
+        self._worker_factory = detector_factory or functools.partial(
+            _make_detector,
+            tag_family, float(quad_decimate), 1, int(min_white_black_diff)
+        )
+        self._local = threading.local()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        
+        # 3D coordinates of tag corners in tag's coordinate system (read-only,
+        # shared between instances with the same tag size)
+        self.object_points = _tag_object_points(float(tag_size))
+        
+        # Constants reused by visualize_detections() on every frame
+        self._axes_3d = np.array([
+            [0, 0, 0],           # Origin
+            [tag_size, 0, 0],    # X-axis
+            [0, tag_size, 0],    # Y-axis
+            [0, 0, -tag_size],   # Z-axis - note negative for right-hand rule
         ], dtype=np.float32)
+        self._proj_out = np.empty((4, 1, 2))
+        
+        # No distortion model at all when every coefficient is zero
+        if dist_coeffs is None or np.count_nonzero(dist_coeffs) == 0:
+            self._dist_for_cv = None
+        else:
+            self._dist_for_cv = np.asarray(dist_coeffs, dtype=np.float64)
+        
+        # Offload color conversion to a CUDA device or OpenCL (T-API) when
+        # available; checked once here rather than per frame
+        self._use_cuda = _cuda_device_count() > 0
+        self._use_opencl = not self._use_cuda and cv2.ocl.haveOpenCL()
     
-    def detect(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    def detect(self, image: np.ndarray, use_tracking: bool = False) -> Detections:
         """
         Detect all AprilTags in the image and estimate their 3D pose.
         
         Parameters
         ----------
         image : np.ndarray
-            Input image (can be color or grayscale).
+            Input image (can be color or grayscale). A 2D uint8 grayscale
+            image is passed to the detector as-is, without conversion.
+        use_tracking : bool, optional
+            For video streams: search only a padded region around the tags
+            found in the previous frame. The whole image is scanned when
+            nothing was found last time and every ``full_scan_period``
+            frames, so new tags are picked up. Default is False.
         
         Returns
         -------
-        List[Dict[str, Any]]
-            List of detected tags, where each tag is a dictionary containing:
+        Detections
+            Detections as per-field arrays (e.g. ``detections.tvecs``).
+            Each element, ``detections[i]``, is a dictionary containing:
             - 'tag_id': int - Unique identifier of the detected tag
             - 'center': np.ndarray - 2D center position in image (x, y)
             - 'corners': np.ndarray - 4x2 array of corner positions
             - 'translation': np.ndarray - 3D translation vector (tx, ty, tz)
             - 'rotation_matrix': np.ndarray - 3x3 rotation matrix
             - 'rotation_vector': np.ndarray - 3D rotation vector (Rodrigues)
+            - 'hamming': int - Error metric (lower is better)
+            - 'decision_margin': float - Confidence metric
+            - 'reprojection_error': float - RMS reprojection error (pixels)
+            - 'alt_translation', 'alt_rotation_vector',
+              'alt_reprojection_error' - The other, higher-error solution of
+              the planar pose ambiguity
         
         Examples
         --------
@@ -114,50 +365,299 @@ class AprilTagDetector:
         >>> for detection in detections:
         ...     print(f"Tag {detection['tag_id']}: Position {detection['translation']}")
         """
-        # Convert to grayscale if needed
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image
+        return self._pack_detections(self._find_tags(image, use_tracking))
+    
+    def detect_batch(self, images: List[np.ndarray]) -> List[Detections]:
+        """
+        Detect AprilTags in several images concurrently.
+        
+        Intended for multi-camera setups: the images are processed on a
+        thread pool of ``nthreads`` workers, which scales because the
+        AprilTag and OpenCV calls release the GIL. The pool is started by the
+        first call and kept until close().
+        
+        Parameters
+        ----------
+        images : List[np.ndarray]
+            Input images (color or grayscale), e.g. one per camera.
+        
+        Returns
+        -------
+        List[Detections]
+            Detections for each image, in input order.
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.nthreads,
+                thread_name_prefix='apriltag',
+                initializer=self._init_worker
+            )
+        return list(self._pool.map(self.detect, images))
+    
+    def close(self):
+        """
+        Shut down the detect_batch() worker pool, if it was started.
+        
+        The detector stays usable; a later detect_batch() call starts a new
+        pool.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def __enter__(self) -> 'AprilTagDetector':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def detect_rigid(
+        self,
+        image: np.ndarray,
+        ref_points_by_id: Dict[int, np.ndarray]
+    ) -> Tuple[Optional[Tuple[np.ndarray, np.ndarray]], Detections]:
+        """
+        Estimate the pose of a rigid multi-tag target with a single PnP solve.
+        
+        The corners of every detected tag listed in ``ref_points_by_id`` are
+        stacked into one set of correspondences, solved with EPnP and refined
+        with Levenberg-Marquardt. Tags not on the target are returned with
+        their individual poses, as from detect().
+        
+        Parameters
+        ----------
+        image : np.ndarray
+            Input image (can be color or grayscale).
+        ref_points_by_id : Dict[int, np.ndarray]
+            Maps tag IDs on the target to the 4x3 coordinates of their
+            corners in the target frame, in the corner order reported by the
+            detector.
+        
+        Returns
+        -------
+        Tuple[Optional[Tuple[np.ndarray, np.ndarray]], Detections]
+            Tuple containing:
+            - Target pose as (translation_vector, rotation_matrix), or None if
+              no target tag was detected or the solve failed
+            - Detections of the standalone tags
+        """
+        tags = self._find_tags(image)
+        target = [tag for tag in tags if tag[0] in ref_points_by_id]
+        standalone = [tag for tag in tags if tag[0] not in ref_points_by_id]
+        
+        pose = None
+        if target:
+            object_points = np.concatenate(
+                [np.asarray(ref_points_by_id[tag_id], dtype=np.float64)
+                 for tag_id, _, _, _ in target]
+            )
+            image_points = np.concatenate(
+                [corners for _, _, corners, _ in target]
+            ).astype(np.float64)
+            
+            success, rvec, tvec = cv2.solvePnP(
+                object_points,
+                image_points,
+                self.camera_matrix,
+                self._dist_for_cv,
+                flags=cv2.SOLVEPNP_EPNP
+            )
+            if success:
+                rvec, tvec = cv2.solvePnPRefineLM(
+                    object_points,
+                    image_points,
+                    self.camera_matrix,
+                    self._dist_for_cv,
+                    rvec,
+                    tvec
+                )
+                rotation_matrix, _ = cv2.Rodrigues(rvec)
+                pose = (tvec.ravel(), rotation_matrix)
+        
+        return pose, self._pack_detections(standalone)
+    
+    def _find_tags(
+        self,
+        image: np.ndarray,
+        use_tracking: bool = False
+    ) -> List[Tuple[int, np.ndarray, np.ndarray, Any]]:
+        """
+        Run the AprilTag detector and return (tag_id, center, corners, result)
+        for each tag, with coordinates in full-resolution pixels.
+        """
+        gray = self._to_gray(image)
+        
+        # Restrict the search to the neighborhood of the last detections. The
+        # tracking state is only read and written by tracked calls, so plain
+        # detect() calls (including detect_batch() workers) leave it alone
+        roi = self._tracking_roi(gray.shape) if use_tracking else None
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            gray = gray[y0:y1, x0:x1]
+            self._frames_since_full_scan += 1
+        elif use_tracking:
+            self._frames_since_full_scan = 0
         
-        # Detect AprilTags
-        results = self.detector.detect(gray)
+        # Detect AprilTags, optionally on a downscaled copy of the image
+        scale = self.downscale
+        if scale > 1.0:
+            small = cv2.resize(
+                gray, None, fx=1.0 / scale, fy=1.0 / scale,
+                interpolation=cv2.INTER_AREA
+            )
+            results = self._thread_detector().detect(small)
+        else:
+            results = self._thread_detector().detect(gray)
         
-        detections = []
+        tags = []
         for result in results:
+            center = result.center
+            corners = result.corners
+            if scale > 1.0:
+                # Map pixel centers of the small image back to full resolution
+                center = (center + 0.5) * scale - 0.5
+                corners = (corners + 0.5) * scale - 0.5
+            if roi is not None:
+                center = center + (x0, y0)
+                corners = corners + (x0, y0)
+            tags.append((result.tag_id, center, corners, result))
+        
+        # Drop duplicate quads of the same marker before running PnP on them
+        tags = _dedupe_tags(tags)
+        
+        if use_tracking:
+            self._last_bbox_per_id = {
+                tag_id: (*corners.min(axis=0), *corners.max(axis=0))
+                for tag_id, _, corners, _ in tags
+            }
+        return tags
+    
+    def _tracking_roi(
+        self,
+        shape: Tuple[int, ...]
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Return the (x0, y0, x1, y1) search window for the next tracked frame,
+        or None when the whole image should be scanned.
+        
+        The window is the union of the previous tag bounding boxes, padded by
+        30% of its size on every side and clipped to the image.
+        """
+        if (not self._last_bbox_per_id
+                or self._frames_since_full_scan >= self._full_scan_period):
+            return None
+        
+        boxes = np.array(list(self._last_bbox_per_id.values()))
+        x0, y0 = boxes[:, :2].min(axis=0)
+        x1, y1 = boxes[:, 2:].max(axis=0)
+        pad_x = 0.3 * (x1 - x0)
+        pad_y = 0.3 * (y1 - y0)
+        height, width = shape[:2]
+        return (
+            max(int(x0 - pad_x), 0),
+            max(int(y0 - pad_y), 0),
+            min(int(math.ceil(x1 + pad_x)) + 1, width),
+            min(int(math.ceil(y1 + pad_y)) + 1, height),
+        )
+    
+    def _pack_detections(
+        self,
+        tags: List[Tuple[int, np.ndarray, np.ndarray, Any]]
+    ) -> Detections:
+        """Solve the per-tag PnP for each tag and pack the results."""
+        detections = Detections.zeros(len(tags))
+        count = 0
+        for tag_id, center, corners, result in tags:
             # Get 2D corner positions in image
-            image_points = result.corners.astype(np.float32)
+            image_points = np.ascontiguousarray(corners, dtype=np.float64)
             
-            # Solve PnP to get pose
-            success, rvec, tvec = cv2.solvePnP(
+            # Solve PnP; IPPE_SQUARE returns both ambiguous planar poses
+            n_solutions, rvecs, tvecs, errors = cv2.solvePnPGeneric(
                 self.object_points,
                 image_points,
                 self.camera_matrix,
-                self.dist_coeffs,
+                self._dist_for_cv,
                 flags=cv2.SOLVEPNP_IPPE_SQUARE  # Best for planar objects
             )
             
-            if success:
-                # Convert rotation vector to rotation matrix
+            if n_solutions > 0:
+                # Keep the pose with the lowest reprojection error
+                errors = errors.ravel()
+                best = int(np.argmin(errors))
+                rvec, tvec = rvecs[best], tvecs[best]
+                if n_solutions > 1:
+                    alt = 1 - best
+                    detections.alt_tvecs[count] = tvecs[alt].ravel()
+                    detections.alt_rvecs[count] = rvecs[alt].ravel()
+                    detections.alt_reproj_errors[count] = errors[alt]
+                detections.reproj_errors[count] = errors[best]
+                
+                # Store the pose and its rotation matrix
                 rotation_matrix, _ = cv2.Rodrigues(rvec)
+                detections.tvecs[count] = tvec.ravel()
+                detections.Rmats[count] = rotation_matrix
+                detections.rvecs[count] = rvec.ravel()
                 
-                detection = {
-                    'tag_id': result.tag_id,
-                    'center': result.center,
-                    'corners': result.corners,
-                    'translation': tvec.flatten(),
-                    'rotation_matrix': rotation_matrix,
-                    'rotation_vector': rvec.flatten(),
-                    'hamming': result.hamming,  # Error metric (lower is better)
-                    'decision_margin': result.decision_margin,  # Confidence metric
-                }
-                detections.append(detection)
-        
-        return detections
+                detections.tag_ids[count] = tag_id
+                detections.centers[count] = center
+                detections.corners[count] = corners
+                detections.hamming[count] = result.hamming  # Error metric (lower is better)
+                detections.decision_margins[count] = result.decision_margin  # Confidence metric
+                count += 1
+        
+        # Integer pixel coordinates for visualize_detections(), computed once
+        np.rint(detections.corners, out=detections.corners_i32, casting='unsafe')
+        np.rint(detections.centers, out=detections.centers_i32, casting='unsafe')
+        
+        return detections[:count]
+    
+    def _to_gray(self, image: np.ndarray) -> np.ndarray:
+        """
+        Convert a BGR image to grayscale; grayscale input is returned as-is.
+        
+        In 'green' mode the green channel is copied out in a single pass. For
+        'bt601' on CUDA or OpenCL hosts the conversion runs on the device and
+        only the single-channel result is copied back. CPU results are written
+        to a per-thread buffer reused across frames.
+        """
+        if image.ndim != 3:
+            return image
+        
+        if self.grayscale_mode == 'green':
+            return cv2.extractChannel(image, 1, dst=self._gray_buffer(image.shape))
+        
+        if self._use_cuda:
+            gpu_frame = getattr(self._local, 'gpu_frame', None)
+            if gpu_frame is None:
+                gpu_frame = self._local.gpu_frame = cv2.cuda_GpuMat()
+            gpu_frame.upload(image)
+            return cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGR2GRAY).download()
+        
+        if self._use_opencl:
+            return cv2.cvtColor(cv2.UMat(image), cv2.COLOR_BGR2GRAY).get()
+        
+        return cv2.cvtColor(
+            image, cv2.COLOR_BGR2GRAY, dst=self._gray_buffer(image.shape)
+        )
+    
+    def _gray_buffer(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """Return the calling thread's grayscale buffer, sized for ``shape``."""
+        gray_buf = getattr(self._local, 'gray_buf', None)
+        if gray_buf is None or gray_buf.shape != shape[:2]:
+            gray_buf = self._local.gray_buf = np.empty(shape[:2], dtype=np.uint8)
+        return gray_buf
+    
+    def _init_worker(self):
+        """Give a detect_batch() worker thread its own AprilTag detector."""
+        self._local.detector = self._worker_factory()
+    
+    def _thread_detector(self) -> Any:
+        """Return the detector owned by the calling thread."""
+        return getattr(self._local, 'detector', self.detector)
     
     def get_pose_from_tag_id(
         self,
-        detections: List[Dict[str, Any]],
+        detections: Union[Detections, List[Dict[str, Any]]],
         tag_id: int
     ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
         """
@@ -165,8 +665,8 @@ class AprilTagDetector:
         
         Parameters
         ----------
-        detections : List[Dict[str, Any]]
-            List of detections from detect() method.
+        detections : Detections or List[Dict[str, Any]]
+            Detections from detect() method, or equivalent dictionaries.
         tag_id : int
             Tag ID to search for.
         
@@ -176,6 +676,12 @@ class AprilTagDetector:
             Tuple of (translation_vector, rotation_matrix) if tag found,
             None otherwise.
         """
+        if isinstance(detections, Detections):
+            i = detections.index_of(tag_id)
+            if i is None:
+                return None
+            return detections.tvecs[i], detections.Rmats[i]
+        
         for detection in detections:
             if detection['tag_id'] == tag_id:
                 return detection['translation'], detection['rotation_matrix']
@@ -184,9 +690,10 @@ class AprilTagDetector:
     def visualize_detections(
         self,
         image: np.ndarray,
-        detections: List[Dict[str, Any]],
+        detections: Union[Detections, List[Dict[str, Any]]],
         draw_axes: bool = True,
-        axis_length: float = None
+        axis_length: float = None,
+        inplace: bool = False
     ) -> np.ndarray:
         """
         Draw detected tags and their coordinate axes on the image.
@@ -194,66 +701,95 @@ class AprilTagDetector:
         Parameters
         ----------
         image : np.ndarray
-            Input image to draw on (will be copied).
-        detections : List[Dict[str, Any]]
-            List of detections from detect() method.
+            Input image to draw on (copied unless ``inplace`` is True).
+        detections : Detections or List[Dict[str, Any]]
+            Detections from detect() method, or equivalent dictionaries.
         draw_axes : bool, optional
             Whether to draw 3D coordinate axes. Default is True.
         axis_length : float, optional
             Length of coordinate axes in meters. Default is tag_size.
+        inplace : bool, optional
+            Draw directly into ``image`` instead of a copy, saving a full-frame
+            allocation per call. The caller's image is modified. Default is
+            False.
         
         Returns
         -------
         np.ndarray
             Image with visualizations drawn.
         """
-        vis_image = image.copy()
+        vis_image = image if inplace else image.copy()
         
-        if axis_length is None:
-            axis_length = self.tag_size
+        # 3D points for axes; the tag-size axes are reused, other lengths are
+        # scaled per call
+        if axis_length is None or axis_length == self.tag_size:
+            axis_points = self._axes_3d
+        else:
+            axis_points = self._axes_3d * np.float32(axis_length / self.tag_size)
         
-        for detection in detections:
-            # Draw tag corners
-            corners = detection['corners'].astype(int)
-            cv2.polylines(vis_image, [corners], True, (0, 255, 0), 2)
-            
-            # Draw tag ID
-            center = detection['center'].astype(int)
+        if len(detections) == 0:
+            return vis_image
+        
+        if isinstance(detections, Detections):
+            tag_ids = detections.tag_ids
+            centers, corners = detections.centers_i32, detections.corners_i32
+            rotation_matrices, tvecs = detections.Rmats, detections.tvecs
+        else:
+            tag_ids = [detection['tag_id'] for detection in detections]
+            centers = np.rint(
+                [detection['center'] for detection in detections]
+            ).astype(np.int32)
+            corners = np.rint(
+                [detection['corners'] for detection in detections]
+            ).astype(np.int32)
+            rotation_matrices = np.array(
+                [detection['rotation_matrix'] for detection in detections]
+            )
+            tvecs = np.array([detection['translation'] for detection in detections])
+        
+        # Draw all tag outlines in one call
+        cv2.polylines(vis_image, list(corners), True, (0, 255, 0), 2)
+        
+        # Draw tag IDs
+        for tag_id, center in zip(tag_ids, centers.tolist()):
             cv2.putText(
                 vis_image,
-                f"ID: {detection['tag_id']}",
+                f"ID: {tag_id}",
                 (center[0] - 20, center[1] - 10),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 0.5,
                 (0, 255, 0),
                 2
             )
+        
+        # Draw 3D coordinate axes
+        if draw_axes:
+            # Transform every tag's axis points into the camera frame, then
+            # project all 4N points with a single call
+            n = len(tag_ids)
+            points_cam = np.matmul(rotation_matrices, axis_points.T).transpose(0, 2, 1)
+            points_cam += tvecs[:, None, :]
+            if self._proj_out.shape[0] != 4 * n:
+                self._proj_out = np.empty((4 * n, 1, 2))
+            image_points, _ = cv2.projectPoints(
+                points_cam.reshape(-1, 3),
+                _ZERO_VEC,
+                _ZERO_VEC,
+                self.camera_matrix,
+                self._dist_for_cv,
+                imagePoints=self._proj_out
+            )
+            axes_2d = np.empty((n, 4, 2), dtype=np.int32)
+            np.rint(image_points.reshape(n, 4, 2), out=axes_2d, casting='unsafe')
             
-            # Draw 3D coordinate axes
-            if draw_axes:
-                # Define 3D points for axes
-                axis_points = np.float32([
-                    [0, 0, 0],              # Origin
-                    [axis_length, 0, 0],    # X-axis (red)
-                    [0, axis_length, 0],    # Y-axis (green)
-                    [0, 0, -axis_length]    # Z-axis (blue) - note negative for right-hand rule
-                ])
-                
-                # Project 3D points to image plane
-                image_points, _ = cv2.projectPoints(
-                    axis_points,
-                    detection['rotation_vector'],
-                    detection['translation'],
-                    self.camera_matrix,
-                    self.dist_coeffs
-                )
-                image_points = image_points.reshape(-1, 2).astype(int)
-                
-                # Draw axes
-                origin = tuple(image_points[0])
-                cv2.line(vis_image, origin, tuple(image_points[1]), (0, 0, 255), 2)  # X: Red
-                cv2.line(vis_image, origin, tuple(image_points[2]), (0, 255, 0), 2)  # Y: Green
-                cv2.line(vis_image, origin, tuple(image_points[3]), (255, 0, 0), 2)  # Z: Blue
+            # Draw each axis of every tag as one batch of origin-endpoint segments
+            for axis, color in (
+                (1, (0, 0, 255)),  # X: Red
+                (2, (0, 255, 0)),  # Y: Green
+                (3, (255, 0, 0)),  # Z: Blue
+            ):
+                segments = np.stack((axes_2d[:, 0], axes_2d[:, axis]), axis=1)
+                cv2.polylines(vis_image, list(segments), False, color, 2)
         
         return vis_image
     
@@ -282,19 +818,105 @@ class AprilTagDetector:
         -------
         np.ndarray
             3x3 camera intrinsic matrix.
-        """
-        # Calculate focal length from FOV
-        fov_rad = np.deg2rad(fov_degrees)
-        focal_length = image_height / (2.0 * np.tan(fov_rad / 2.0))
-        
-        # Principal point at image center
-        cx = image_width / 2.0
-        cy = image_height / 2.0
-        
-        camera_matrix = np.array([
-            [focal_length, 0, cx],
-            [0, focal_length, cy],
-            [0, 0, 1]
-        ], dtype=np.float32)
         
-        return camera_matrix
+        Notes
+        -----
+        Results are cached per (image_width, image_height, fov_degrees);
+        each call returns a fresh array that the caller may modify.
+        """
+        return _default_K(image_width, image_height, fov_degrees).copy()
+
+
+# Centers of same-ID detections closer than this (in pixels) are duplicates
+_DUPLICATE_CENTER_DIST = 2.0
+
+
+def _dedupe_tags(
+    tags: List[Tuple[int, np.ndarray, np.ndarray, Any]]
+) -> List[Tuple[int, np.ndarray, np.ndarray, Any]]:
+    """
+    Collapse near-identical detections of the same physical marker.
+    
+    Detections sharing a tag ID whose centers lie within
+    ``_DUPLICATE_CENTER_DIST`` pixels are merged, keeping the one with the
+    highest decision margin. Input order is otherwise preserved.
+    """
+    kept = []
+    kept_by_id: Dict[int, List[int]] = {}
+    for tag in tags:
+        tag_id, center = tag[0], tag[1]
+        for k in kept_by_id.setdefault(tag_id, []):
+            other = kept[k]
+            dx, dy = center[0] - other[1][0], center[1] - other[1][1]
+            if math.hypot(dx, dy) < _DUPLICATE_CENTER_DIST:
+                if tag[3].decision_margin > other[3].decision_margin:
+                    kept[k] = tag
+                break
+        else:
+            kept_by_id[tag_id].append(len(kept))
+            kept.append(tag)
+    return kept
+
+
+def _make_detector(
+    tag_family: str,
+    quad_decimate: float,
+    nthreads: int,
+    min_white_black_diff: int
+) -> 'apriltag.Detector':
+    """Create an AprilTag detector with the given options."""
+    options = apriltag.DetectorOptions(
+        families=tag_family,
+        nthreads=nthreads,
+        quad_decimate=quad_decimate
+    )
+    if hasattr(options, 'min_white_black_diff'):
+        options.min_white_black_diff = min_white_black_diff
+    return apriltag.Detector(options)
+
+
+@functools.lru_cache(maxsize=8)
+def _tag_object_points(tag_size: float) -> np.ndarray:
+    """Return the read-only 4x3 tag corner coordinates for ``tag_size``."""
+    # Tag is centered at origin, lying in XY plane
+    half_size = tag_size / 2.0
+    object_points = np.ascontiguousarray([
+        [-half_size, -half_size, 0],  # Bottom-left
+        [ half_size, -half_size, 0],  # Bottom-right
+        [ half_size,  half_size, 0],  # Top-right
+        [-half_size,  half_size, 0],  # Top-left
+    ], dtype=np.float64)
+    object_points.setflags(write=False)
+    return object_points
+
+
+def _cuda_device_count() -> int:
+    """Return the number of CUDA devices usable by OpenCV (0 without CUDA)."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount()
+    except (AttributeError, cv2.error):
+        return 0
+
+
+@functools.lru_cache(maxsize=32)
+def _default_K(
+    image_width: int,
+    image_height: int,
+    fov_degrees: float
+) -> np.ndarray:
+    """Compute the default camera matrix as a shared, read-only array."""
+    # Calculate focal length from FOV (scalar math avoids NumPy ufunc dispatch)
+    fov_rad = math.radians(fov_degrees)
+    focal_length = image_height / (2.0 * math.tan(fov_rad / 2.0))
+    
+    # Principal point at image center
+    cx = image_width / 2.0
+    cy = image_height / 2.0
+    
+    K = np.array([
+        [focal_length, 0.0, cx],
+        [0.0, focal_length, cy],
+        [0.0, 0.0, 1.0],
+    ], dtype=np.float32)
+    K.setflags(write=False)
+    return K
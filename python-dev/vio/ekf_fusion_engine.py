@@ -6,9 +6,332 @@ Kalman Filter for fusing IMU pre-integration and AprilTag pose measurements
 in a loosely-coupled Visual-Inertial Odometry system.
 """
 
+import math
+
 import numpy as np
-from scipy.spatial.transform import Rotation
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union, TYPE_CHECKING
+
+from ._jit import njit, HAVE_NUMBA
+from ._rotation import rotation_cls
+
+if TYPE_CHECKING:
+    from scipy.spatial.transform import Rotation
+
+
+# State indices observed by a pose measurement: position and orientation
+# (quaternion). The 7x16 measurement matrix H is the selector of these rows,
+# so H @ x, P @ H^T and H @ P reduce to gathers.
+_MEAS_IDX = np.array([0, 1, 2, 6, 7, 8, 9])
+
+_I16 = np.eye(16)
+
+# Byte alignment of the state, covariance and scratch arrays (one cache line,
+# which also covers AVX/AVX-512 vector loads)
+_BUFFER_ALIGNMENT = 64
+
+
+def _work_layout(*sizes: int) -> Tuple[Tuple[int, ...], int]:
+    """Offsets of consecutive blocks, each padded to 8 elements, and the total size."""
+    offsets, end = [], 0
+    for size in sizes:
+        offsets.append(end)
+        end += -(-size // 8) * 8
+    return tuple(offsets), end
+
+
+# Scratch space of the update step, carved out of one work array so the jitted
+# core receives a single buffer: innovation y (7), P H^T (16x7), H P (7x16),
+# S (7x7), K (16x7), K H P (16x16) and the state correction K y (16)
+(_W_Y, _W_PHT, _W_HP, _W_S, _W_K, _W_KHP, _W_DX), _WORK_SIZE = _work_layout(
+    7, 16 * 7, 7 * 16, 7 * 7, 16 * 7, 16 * 16, 16
+)
+
+
+def _aligned_empty(shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+    """Uninitialized C-contiguous array starting on a ``_BUFFER_ALIGNMENT`` boundary."""
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    raw = np.empty(nbytes + _BUFFER_ALIGNMENT, dtype=np.uint8)
+    offset = -raw.ctypes.data % _BUFFER_ALIGNMENT
+    return raw[offset:offset + nbytes].view(dtype).reshape(shape)
+
+
+def _aligned_copy(array: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """Aligned C-contiguous copy of ``array`` converted to ``dtype``."""
+    array = np.asarray(array)
+    out = _aligned_empty(array.shape, dtype)
+    out[...] = array
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def _quat_mul_wxyz(q, p):
+    """Hamilton product q * p of two [w, x, y, z] quaternions, as a tuple."""
+    w1, x1, y1, z1 = q[0], q[1], q[2], q[3]
+    w2, x2, y2, z2 = p[0], p[1], p[2], p[3]
+    return (
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+    )
+
+
+@njit(cache=True, fastmath=True)
+def _normalize_quat(state):
+    """
+    Normalize the orientation quaternion ``state[6:10]`` in place.
+    
+    A single reciprocal square root over the sum of squares; no rescaling
+    against overflow/underflow is needed for a quaternion kept near unit norm.
+    The arithmetic is done in float64 whatever the dtype of ``state``; the
+    components are widened with ``np.float64`` because Numba's ``float()``
+    keeps float32 values in single precision.
+    """
+    f64 = np.float64
+    w, x, y, z = f64(state[6]), f64(state[7]), f64(state[8]), f64(state[9])
+    inv = 1.0 / math.sqrt(w * w + x * x + y * y + z * z)
+    state[6] = w * inv
+    state[7] = x * inv
+    state[8] = y * inv
+    state[9] = z * inv
+
+
+@njit(cache=True, fastmath=True)
+def _transition_matrix(dt):
+    """State transition matrix F of the constant-velocity motion model."""
+    F = np.eye(16)
+    for i in range(3):
+        F[i, 3 + i] = dt
+    return F
+
+
+@njit(cache=True, fastmath=True)
+def _symmetrize_kernel(P):
+    """Replace ``P`` in place with (P + P^T) / 2."""
+    n = P.shape[0]
+    for i in range(n):
+        for j in range(i + 1, n):
+            v = 0.5 * (P[i, j] + P[j, i])
+            P[i, j] = v
+            P[j, i] = v
+
+
+def _symmetrize_numpy(P):
+    """
+    NumPy equivalent of ``_symmetrize_kernel``.
+    
+    NumPy detects the overlap between ``P`` and ``P.T`` and buffers the
+    addition; the jitted kernel does not, hence its explicit loop.
+    """
+    np.add(P, P.T, out=P)
+    P *= 0.5
+
+
+_symmetrize = _symmetrize_kernel if HAVE_NUMBA else _symmetrize_numpy
+
+
+@njit(cache=True, fastmath=True)
+def _predict_core(state, cov, dp, dv, dq_wxyz, dt, Q_dt):
+    """
+    Numeric core of ``EKFFusionEngine.predict``.
+    
+    Propagates ``state`` (16,) and ``cov`` (16, 16) in place. ``dq_wxyz`` is
+    the pre-integrated rotation as a [w, x, y, z] quaternion and ``Q_dt`` the
+    process noise already scaled by ``dt``: a (16, 16) matrix, or a (16,)
+    vector holding the diagonal of a diagonal ``Q``.
+    """
+    # Position from the velocity at the start of the interval, then velocity
+    for i in range(3):
+        state[i] += state[3 + i] * dt + dp[i]
+        state[3 + i] += dv[i]
+    
+    # Orientation: q_new = q_old * delta_q (Hamilton product, [w, x, y, z])
+    state[6], state[7], state[8], state[9] = _quat_mul_wxyz(state[6:10], dq_wxyz)
+    _normalize_quat(state)
+    
+    # Biases remain constant in prediction
+    
+    # Covariance: P = F * P * F^T + Q * dt. F is the identity plus dt in the
+    # position-velocity block, so F * P adds dt * P[3:6, :] to rows 0:3 and
+    # (F * P) * F^T adds dt * columns 3:6 to columns 0:3
+    cov[0:3, :] += dt * cov[3:6, :]
+    cov[:, 0:3] += dt * cov[:, 3:6]
+    if Q_dt.ndim == 1:
+        # Diagonal Q: add along the diagonal only. Indexed rather than through
+        # a flat view, which would need a C-contiguous ``cov``
+        for i in range(cov.shape[0]):
+            cov[i, i] += Q_dt[i]
+    else:
+        cov += Q_dt
+    _symmetrize(cov)
+
+
+@njit(cache=True, fastmath=True)
+def _kalman_gain_kernel(PHt, S, K):
+    """
+    Kalman gain K = P H^T S^-1 by Cholesky solve, written into ``K``.
+    
+    ``S`` is symmetric positive-definite, so it is factored as L L^T and each
+    row of ``PHt`` is solved by forward and back substitution instead of
+    forming the inverse.
+    """
+    L = np.linalg.cholesky(S)
+    K[:, :] = PHt
+    rows, m = K.shape
+    for r in range(rows):
+        # Solve L u = k, then L^T k = u (k is one row of K)
+        for i in range(m):
+            acc = K[r, i]
+            for j in range(i):
+                acc -= L[i, j] * K[r, j]
+            K[r, i] = acc / L[i, i]
+        for i in range(m - 1, -1, -1):
+            acc = K[r, i]
+            for j in range(i + 1, m):
+                acc -= L[j, i] * K[r, j]
+            K[r, i] = acc / L[i, i]
+
+
+def _kalman_gain_numpy(PHt, S, K):
+    """NumPy/SciPy equivalent of ``_kalman_gain_kernel``."""
+    from scipy.linalg import cho_factor, cho_solve
+    K[:, :] = cho_solve(cho_factor(S, lower=True, overwrite_a=True), PHt.T).T
+
+
+_kalman_gain = _kalman_gain_kernel if HAVE_NUMBA else _kalman_gain_numpy
+
+
+@njit(cache=True, fastmath=True)
+def _gather_kernel(cov, PHt, HP, S):
+    """Gather P H^T, H P and H P H^T from ``cov`` into the given arrays."""
+    m = _MEAS_IDX.shape[0]
+    for i in range(cov.shape[0]):
+        for c in range(m):
+            PHt[i, c] = cov[i, _MEAS_IDX[c]]
+            HP[c, i] = cov[_MEAS_IDX[c], i]
+    for r in range(m):
+        for c in range(m):
+            S[r, c] = cov[_MEAS_IDX[r], _MEAS_IDX[c]]
+
+
+def _gather_numpy(cov, PHt, HP, S):
+    """NumPy equivalent of ``_gather_kernel``."""
+    np.take(cov, _MEAS_IDX, axis=1, out=PHt)
+    np.take(cov, _MEAS_IDX, axis=0, out=HP)
+    np.take(PHt, _MEAS_IDX, axis=0, out=S)
+
+
+_gather = _gather_kernel if HAVE_NUMBA else _gather_numpy
+
+
+@njit(cache=True, fastmath=True)
+def _update_core(state, cov, z, R, joseph, work):
+    """
+    Numeric core of ``EKFFusionEngine.update``.
+    
+    Corrects ``state`` (16,) and ``cov`` (16, 16) in place with the 7D
+    measurement ``z`` = [position, quaternion w, x, y, z], using ``work``
+    (``_WORK_SIZE``,) for intermediates. The quaternion part of ``z``
+    may be negated in place. With ``joseph`` the covariance uses the Joseph
+    form, which stays positive semi-definite under rounding at the cost of two
+    extra 16x16 products.
+    """
+    # Handle quaternion ambiguity (q and -q represent same rotation): flip
+    # the measured quaternion onto the hemisphere of the predicted one
+    d = z[3] * state[6] + z[4] * state[7] + z[5] * state[8] + z[6] * state[9]
+    sign = math.copysign(1.0, d)
+    for i in range(3, 7):
+        z[i] *= sign
+    
+    # Views of the intermediates in the work array
+    y = work[_W_Y:_W_Y + 7]
+    PHt = work[_W_PHT:_W_PHT + 112].reshape((16, 7))
+    HP = work[_W_HP:_W_HP + 112].reshape((7, 16))
+    S = work[_W_S:_W_S + 49].reshape((7, 7))
+    K = work[_W_K:_W_K + 112].reshape((16, 7))
+    KHP = work[_W_KHP:_W_KHP + 256].reshape((16, 16))
+    dx = work[_W_DX:_W_DX + 16]
+    
+    # Innovation (measurement residual)
+    np.subtract(z, state[_MEAS_IDX], y)
+    
+    # Innovation covariance S = H P H^T + R and Kalman gain K = P H^T S^-1
+    _gather(cov, PHt, HP, S)
+    S += R
+    _kalman_gain(PHt, S, K)
+    
+    # Update state and normalize quaternion
+    np.dot(K, y, dx)
+    state += dx
+    _normalize_quat(state)
+    
+    if joseph:
+        # P = (I - K H) P (I - K H)^T + K R K^T
+        A = _I16.astype(cov.dtype)
+        for c in range(_MEAS_IDX.shape[0]):
+            A[:, _MEAS_IDX[c]] -= K[:, c]
+        cov[:, :] = (A @ cov @ np.ascontiguousarray(A.T)
+                     + K @ R @ np.ascontiguousarray(K.T))
+    else:
+        # P = (I - K H) P = P - K (H P)
+        np.dot(K, HP, KHP)
+        cov -= KHP
+    _symmetrize(cov)
+
+
+@njit(cache=True, nogil=True)
+def _predict_batch_core(state, cov, dp, dv, dq_wxyz, dt, Q, Q_dt):
+    """
+    Run ``_predict_core`` over rows of the (N, ...) input arrays. ``Q`` is
+    the process noise in either form accepted by ``_predict_core`` and
+    ``Q_dt`` an array of the same shape used as scratch space for ``Q * dt``.
+    """
+    for k in range(dt.shape[0]):
+        np.multiply(Q, dt[k], Q_dt)
+        _predict_core(state, cov, dp[k], dv[k], dq_wxyz[k], dt[k], Q_dt)
+
+
+@njit(cache=True, nogil=True)
+def _update_batch_core(state, cov, z, R, joseph, work):
+    """Run ``_update_core`` over the rows of the (N, 7) measurements ``z``."""
+    for k in range(z.shape[0]):
+        _update_core(state, cov, z[k], R, joseph, work)
+
+
+def quat_xyzw_to_wxyz(quat: np.ndarray) -> np.ndarray:
+    """
+    Reorder scalar-last [x, y, z, w] quaternions to scalar-first [w, x, y, z].
+    
+    Converts the quaternions returned by ``IMUProcessor.preintegrate`` and
+    scipy's ``as_quat()`` into the order used by the EKF. Accepts shape (4,)
+    or (N, 4) and returns a new array.
+    """
+    return np.asarray(quat)[..., [3, 0, 1, 2]]
+
+
+def quat_wxyz_to_xyzw(quat: np.ndarray) -> np.ndarray:
+    """
+    Reorder scalar-first [w, x, y, z] quaternions to scalar-last [x, y, z, w].
+    
+    Inverse of ``quat_xyzw_to_wxyz``: converts EKF quaternions for
+    ``IMUProcessor.preintegrate`` and scipy's ``from_quat()``.
+    """
+    return np.asarray(quat)[..., [1, 2, 3, 0]]
+
+
+def _as_quat_wxyz(rotation: Union['Rotation', np.ndarray]) -> np.ndarray:
+    """
+    Convert orientations to [w, x, y, z] float64 quaternions.
+    
+    Accepts a scipy ``Rotation`` (single or stacked) or an array-like of
+    shape (4,) or (N, 4), which is taken to be [w, x, y, z] already. Rotations
+    are recognized by their ``as_quat`` method, so raw arrays never touch
+    scipy.
+    """
+    if hasattr(rotation, 'as_quat'):
+        return quat_xyzw_to_wxyz(rotation.as_quat())
+    return np.asarray(rotation, dtype=np.float64)
 
 
 class EKFFusionEngine:
@@ -36,6 +359,18 @@ class EKFFusionEngine:
         Process noise covariance matrix (16x16). Default based on typical IMU noise.
     measurement_noise : np.ndarray, optional
         Measurement noise covariance for pose measurements (7x7 for position + quaternion).
+    joseph_form : bool, optional
+        Use the Joseph form of the covariance update, which is more robust to
+        rounding but slower. Default is False.
+    dtype : type or np.dtype, optional
+        Floating-point type of the state, covariance and noise matrices.
+        ``np.float32`` halves their size and is usually accurate enough for
+        on-vehicle use. Default is ``np.float64``.
+    
+    Orientations can be passed to ``predict``, ``update`` and ``reset`` as
+    scipy ``Rotation`` objects or as raw [w, x, y, z] quaternions; the filter
+    itself works on raw quaternions only, and ``get_state`` is the one place
+    that builds a ``Rotation``.
     
     Attributes
     ----------
@@ -50,47 +385,59 @@ class EKFFusionEngine:
         initial_state: Optional[np.ndarray] = None,
         initial_covariance: Optional[np.ndarray] = None,
         process_noise: Optional[np.ndarray] = None,
-        measurement_noise: Optional[np.ndarray] = None
+        measurement_noise: Optional[np.ndarray] = None,
+        joseph_form: bool = False,
+        dtype: Union[type, np.dtype] = np.float64
     ):
         """Initialize the EKF fusion engine."""
-        # Initialize state vector
+        self.dtype = np.dtype(dtype)
+        
+        # Initialize state vector (state and covariance are kept in aligned,
+        # C-contiguous memory, as are the update buffers below)
         if initial_state is not None:
-            self.state = initial_state.copy()
+            self.state = _aligned_copy(initial_state, self.dtype)
         else:
-            self.state = np.zeros(16)
+            self.state = _aligned_copy(np.zeros(16), self.dtype)
             self.state[6:10] = np.array([1, 0, 0, 0])  # Unit quaternion [w, x, y, z]
         
         # Initialize covariance
         if initial_covariance is not None:
-            self.covariance = initial_covariance.copy()
+            self.covariance = _aligned_copy(initial_covariance, self.dtype)
         else:
-            self.covariance = np.eye(16) * 0.1
+            self.covariance = _aligned_copy(np.eye(16) * 0.1, self.dtype)
         
         # Process noise covariance (tuned for typical IMU characteristics)
         if process_noise is not None:
-            self.Q = process_noise.copy()
+            self.Q = np.array(process_noise, dtype=self.dtype)
         else:
-            self.Q = np.eye(16)
-            self.Q[0:3, 0:3] *= 0.01    # Position process noise
-            self.Q[3:6, 3:6] *= 0.01    # Velocity process noise
-            self.Q[6:10, 6:10] *= 0.001 # Orientation process noise
-            self.Q[10:13, 10:13] *= 0.0001  # Gyro bias process noise
-            self.Q[13:16, 13:16] *= 0.001   # Accel bias process noise
+            Q = np.eye(16, dtype=self.dtype)
+            Q[0:3, 0:3] *= 0.01    # Position process noise
+            Q[3:6, 3:6] *= 0.01    # Velocity process noise
+            Q[6:10, 6:10] *= 0.001 # Orientation process noise
+            Q[10:13, 10:13] *= 0.0001  # Gyro bias process noise
+            Q[13:16, 13:16] *= 0.001   # Accel bias process noise
+            self.Q = Q
         
         # Measurement noise covariance
         if measurement_noise is not None:
-            self.R = measurement_noise.copy()
+            self.R = np.array(measurement_noise, dtype=self.dtype)
         else:
             # 7D measurement: position (3D) + quaternion (4D)
-            self.R = np.eye(7)
+            self.R = np.eye(7, dtype=self.dtype)
             self.R[0:3, 0:3] *= 0.01   # Position measurement noise (1cm std)
             self.R[3:7, 3:7] *= 0.001  # Orientation measurement noise
+        
+        self.joseph_form = joseph_form
+        
+        # Measurement vector and intermediates reused by update()
+        self._z = _aligned_empty((7,), self.dtype)
+        self._work = _aligned_empty((_WORK_SIZE,), self.dtype)
     
     def predict(
         self,
         delta_position: np.ndarray,
         delta_velocity: np.ndarray,
-        delta_rotation: Rotation,
+        delta_rotation: Union['Rotation', np.ndarray],
         dt: float
     ):
         """
@@ -106,53 +453,72 @@ class EKFFusionEngine:
             Position change from IMU pre-integration (3D, meters).
         delta_velocity : np.ndarray
             Velocity change from IMU pre-integration (3D, m/s).
-        delta_rotation : Rotation
-            Orientation change from IMU pre-integration.
+        delta_rotation : Rotation or np.ndarray
+            Orientation change from IMU pre-integration, as a ``Rotation`` or
+            a quaternion [w, x, y, z].
         dt : float
             Time interval of pre-integration (seconds).
         """
-        # Extract current state
-        position = self.state[0:3]
-        velocity = self.state[3:6]
-        quat = self.state[6:10]
-        current_rotation = Rotation.from_quat([quat[1], quat[2], quat[3], quat[0]])  # Convert [w,x,y,z] to [x,y,z,w]
-        
-        # Predict new state
-        # Position: p_new = p_old + v_old * dt + delta_p
-        new_position = position + velocity * dt + delta_position
-        
-        # Velocity: v_new = v_old + delta_v
-        new_velocity = velocity + delta_velocity
-        
-        # Orientation: q_new = q_old * delta_q
-        new_rotation = current_rotation * delta_rotation
-        new_quat_xyzw = new_rotation.as_quat()
-        new_quat = np.array([new_quat_xyzw[3], new_quat_xyzw[0], new_quat_xyzw[1], new_quat_xyzw[2]])  # Convert to [w,x,y,z]
-        
-        # Biases remain constant in prediction
-        gyro_bias = self.state[10:13]
-        accel_bias = self.state[13:16]
-        
-        # Update state
-        self.state[0:3] = new_position
-        self.state[3:6] = new_velocity
-        self.state[6:10] = new_quat
-        self.state[10:13] = gyro_bias
-        self.state[13:16] = accel_bias
-        
-        # Normalize quaternion
-        self.state[6:10] /= np.linalg.norm(self.state[6:10])
+        dt = float(dt)
+        _predict_core(
+            self.state,
+            self.covariance,
+            np.asarray(delta_position, dtype=self.dtype),
+            np.asarray(delta_velocity, dtype=self.dtype),
+            np.asarray(_as_quat_wxyz(delta_rotation), dtype=self.dtype),
+            dt,
+            self._scaled_process_noise(dt),
+        )
+    
+    @property
+    def Q(self) -> np.ndarray:
+        """Process noise covariance (16x16); may be reassigned or edited in place."""
+        return self._Q
+    
+    @Q.setter
+    def Q(self, value: np.ndarray):
+        self._Q = np.asarray(value, dtype=self.dtype)
+        # (bytes of Q, Q or its diagonal) for the current Q, and (dt, that
+        # array, its product with dt) from the last predict; IMU windows
+        # usually share dt
+        self._q_base_cache = (None, None)
+        self._q_dt_cache = (None, None, None)
+    
+    def _process_noise_base(self) -> np.ndarray:
+        """
+        Return ``Q`` in the form passed to the predict cores: its diagonal as
+        a (16,) vector when ``Q`` is diagonal (as the default is), otherwise
+        the full matrix.
         
-        # Update covariance: P = F * P * F^T + Q
-        # For simplicity, using a constant state transition matrix
-        # In practice, should compute Jacobian of motion model
-        F = self._compute_state_transition_matrix(dt)
-        self.covariance = F @ self.covariance @ F.T + self.Q * dt
+        The result is cached against a byte snapshot of ``Q``, which is much
+        cheaper to compare than the array itself, so edits made to ``Q`` in
+        place are picked up on the next call.
+        """
+        Q = self._Q
+        snapshot = Q.tobytes()
+        cached_snapshot, base = self._q_base_cache
+        if snapshot != cached_snapshot:
+            diagonal = np.diagonal(Q)
+            base = diagonal.copy() if np.array_equal(Q, np.diag(diagonal)) else Q.copy()
+            self._q_base_cache = (snapshot, base)
+        return base
+    
+    def _scaled_process_noise(self, dt: float) -> np.ndarray:
+        """
+        Return ``_process_noise_base() * dt``, reusing the previous product
+        when neither ``dt`` nor ``Q`` has changed.
+        """
+        base = self._process_noise_base()
+        cached_dt, cached_base, Q_dt = self._q_dt_cache
+        if dt != cached_dt or cached_base is not base:
+            Q_dt = base * dt
+            self._q_dt_cache = (dt, base, Q_dt)
+        return Q_dt
     
     def update(
         self,
         measured_position: np.ndarray,
-        measured_rotation: Rotation
+        measured_rotation: Union['Rotation', np.ndarray]
     ):
         """
         EKF Update step using AprilTag pose measurement.
@@ -165,54 +531,82 @@ class EKFFusionEngine:
         ----------
         measured_position : np.ndarray
             Measured 3D position from AprilTag (meters).
-        measured_rotation : Rotation
-            Measured orientation from AprilTag.
+        measured_rotation : Rotation or np.ndarray
+            Measured orientation from AprilTag, as a ``Rotation`` or a
+            quaternion [w, x, y, z].
         """
-        # Convert measured rotation to quaternion [w, x, y, z]
-        measured_quat_xyzw = measured_rotation.as_quat()
-        measured_quat = np.array([
-            measured_quat_xyzw[3],
-            measured_quat_xyzw[0],
-            measured_quat_xyzw[1],
-            measured_quat_xyzw[2]
-        ])
-        
-        # Measurement vector (7D: position + quaternion)
-        z = np.concatenate([measured_position, measured_quat])
-        
-        # Predicted measurement (from current state)
-        predicted_position = self.state[0:3]
-        predicted_quat = self.state[6:10]
-        h = np.concatenate([predicted_position, predicted_quat])
-        
-        # Innovation (measurement residual)
-        # For quaternions, we need special handling to ensure shortest path
-        y = z - h
-        
-        # Handle quaternion ambiguity (q and -q represent same rotation)
-        if np.dot(measured_quat, predicted_quat) < 0:
-            y[3:7] = z[3:7] + h[3:7]  # Use opposite sign
-        
-        # Measurement matrix (7x16): we observe position and orientation
-        H = np.zeros((7, 16))
-        H[0:3, 0:3] = np.eye(3)  # Position
-        H[3:7, 6:10] = np.eye(4)  # Orientation (quaternion)
-        
-        # Innovation covariance
-        S = H @ self.covariance @ H.T + self.R
+        # Measurement vector (7D: position + quaternion [w, x, y, z])
+        z = self._z
+        z[0:3] = measured_position
+        z[3:7] = _as_quat_wxyz(measured_rotation)
+        
+        _update_core(
+            self.state, self.covariance, z, self.R, self.joseph_form, self._work
+        )
+    
+    def predict_batch(
+        self,
+        delta_positions: np.ndarray,
+        delta_velocities: np.ndarray,
+        delta_rotations: Union['Rotation', np.ndarray],
+        dts: Union[float, np.ndarray]
+    ):
+        """
+        Run a sequence of prediction steps in one call.
         
-        # Kalman gain
-        K = self.covariance @ H.T @ np.linalg.inv(S)
+        Equivalent to calling ``predict`` for each row in order, but the loop
+        runs in compiled code, which suits replaying recorded logs.
         
-        # Update state
-        self.state = self.state + K @ y
+        Parameters
+        ----------
+        delta_positions : np.ndarray
+            Position changes from IMU pre-integration (Nx3, meters).
+        delta_velocities : np.ndarray
+            Velocity changes from IMU pre-integration (Nx3, m/s).
+        delta_rotations : Rotation or np.ndarray
+            Orientation changes, as a stacked ``Rotation`` of length N or
+            quaternions [w, x, y, z] (Nx4).
+        dts : float or np.ndarray
+            Time interval of each pre-integration (seconds), scalar or (N,).
+        """
+        dp = np.ascontiguousarray(delta_positions, dtype=self.dtype).reshape(-1, 3)
+        dv = np.ascontiguousarray(delta_velocities, dtype=self.dtype).reshape(-1, 3)
+        dq = np.ascontiguousarray(_as_quat_wxyz(delta_rotations), dtype=self.dtype).reshape(-1, 4)
+        dt = np.ascontiguousarray(
+            np.broadcast_to(np.asarray(dts, dtype=self.dtype), (dp.shape[0],))
+        )
+        Q = self._process_noise_base()
+        _predict_batch_core(
+            self.state, self.covariance, dp, dv, dq, dt, Q, np.empty_like(Q)
+        )
+    
+    def update_batch(
+        self,
+        measured_positions: np.ndarray,
+        measured_rotations: Union['Rotation', np.ndarray]
+    ):
+        """
+        Run a sequence of update steps in one call.
         
-        # Normalize quaternion after update
-        self.state[6:10] /= np.linalg.norm(self.state[6:10])
+        Equivalent to calling ``update`` for each row in order, with the loop
+        running in compiled code.
         
-        # Update covariance: P = (I - K * H) * P
-        I = np.eye(16)
-        self.covariance = (I - K @ H) @ self.covariance
+        Parameters
+        ----------
+        measured_positions : np.ndarray
+            Measured 3D positions (Nx3, meters).
+        measured_rotations : Rotation or np.ndarray
+            Measured orientations, as a stacked ``Rotation`` of length N or
+            quaternions [w, x, y, z] (Nx4).
+        """
+        positions = np.asarray(measured_positions, dtype=self.dtype).reshape(-1, 3)
+        z = np.empty((positions.shape[0], 7), dtype=self.dtype)
+        z[:, 0:3] = positions
+        z[:, 3:7] = _as_quat_wxyz(measured_rotations).reshape(-1, 4)
+        
+        _update_batch_core(
+            self.state, self.covariance, z, self.R, self.joseph_form, self._work
+        )
     
     def _compute_state_transition_matrix(self, dt: float) -> np.ndarray:
         """
@@ -230,15 +624,9 @@ class EKFFusionEngine:
         np.ndarray
             State transition matrix (16x16).
         """
-        F = np.eye(16)
-        
-        # Position depends on velocity
-        F[0:3, 3:6] = np.eye(3) * dt
-        
-        # Velocity, orientation, and biases are independent in this simplified model
-        # In a more sophisticated implementation, would include coupling terms
-        
-        return F
+        # Position depends on velocity; velocity, orientation, and biases are
+        # independent in this simplified model
+        return _transition_matrix(dt)
     
     def get_state(self) -> dict:
         """
@@ -256,28 +644,64 @@ class EKFFusionEngine:
             - 'accel_bias': Accelerometer bias (m/s^2)
         """
         quat = self.state[6:10]
-        # Convert [w, x, y, z] to [x, y, z, w] for scipy
-        quat_xyzw = np.array([quat[1], quat[2], quat[3], quat[0]])
         
         return {
             'position': self.state[0:3].copy(),
             'velocity': self.state[3:6].copy(),
-            'orientation': Rotation.from_quat(quat_xyzw),
+            'orientation': rotation_cls().from_quat(quat_wxyz_to_xyzw(quat)),
             'quaternion': quat.copy(),
             'gyro_bias': self.state[10:13].copy(),
             'accel_bias': self.state[13:16].copy()
         }
     
-    def get_covariance(self) -> np.ndarray:
+    def get_state_view(self) -> dict:
+        """
+        Get the current state estimate as read-only views, without copying.
+        
+        The arrays share memory with ``state`` and change with the next
+        ``predict``/``update``; use ``get_state`` for a snapshot. No
+        ``Rotation`` is built.
+        
+        Returns
+        -------
+        dict
+            Dictionary containing read-only views:
+            - 'position': 3D position (meters)
+            - 'velocity': 3D velocity (m/s)
+            - 'quaternion': Orientation as quaternion [w, x, y, z]
+            - 'gyro_bias': Gyroscope bias (rad/s)
+            - 'accel_bias': Accelerometer bias (m/s^2)
+        """
+        view = self.state.view()
+        view.flags.writeable = False
+        return {
+            'position': view[0:3],
+            'velocity': view[3:6],
+            'quaternion': view[6:10],
+            'gyro_bias': view[10:13],
+            'accel_bias': view[13:16]
+        }
+    
+    def get_covariance(self, copy: bool = True) -> np.ndarray:
         """
         Get the current state covariance matrix.
         
+        Parameters
+        ----------
+        copy : bool, optional
+            If False, return a read-only view that changes with the next
+            ``predict``/``update`` instead of a copy. Default is True.
+        
         Returns
         -------
         np.ndarray
             State covariance matrix (16x16).
         """
-        return self.covariance.copy()
+        if copy:
+            return self.covariance.copy()
+        view = self.covariance.view()
+        view.flags.writeable = False
+        return view
     
     def get_position_uncertainty(self) -> float:
         """
@@ -288,13 +712,13 @@ class EKFFusionEngine:
         float
             3D position uncertainty (meters).
         """
-        position_cov = self.covariance[0:3, 0:3]
-        return np.sqrt(np.trace(position_cov))
+        P = self.covariance
+        return math.sqrt(P[0, 0] + P[1, 1] + P[2, 2])
     
     def reset(
         self,
         position: Optional[np.ndarray] = None,
-        orientation: Optional[Rotation] = None
+        orientation: Optional[Union['Rotation', np.ndarray]] = None
     ):
         """
         Reset the filter with a new initial state.
@@ -303,27 +727,24 @@ class EKFFusionEngine:
         ----------
         position : np.ndarray, optional
             Initial position (3D). Default is origin.
-        orientation : Rotation, optional
-            Initial orientation. Default is identity.
+        orientation : Rotation or np.ndarray, optional
+            Initial orientation, as a ``Rotation`` or a quaternion
+            [w, x, y, z]. Default is identity.
         """
-        self.state = np.zeros(16)
+        # Reset in place so views from get_state_view stay valid
+        self.state[:] = 0.0
         
         if position is not None:
             self.state[0:3] = position
         
         if orientation is not None:
-            quat_xyzw = orientation.as_quat()
-            self.state[6:10] = np.array([
-                quat_xyzw[3],
-                quat_xyzw[0],
-                quat_xyzw[1],
-                quat_xyzw[2]
-            ])
+            self.state[6:10] = _as_quat_wxyz(orientation)
         else:
             self.state[6:10] = np.array([1, 0, 0, 0])  # Unit quaternion
         
         # Reset covariance
-        self.covariance = np.eye(16) * 0.1
+        self.covariance[:] = 0.0
+        np.fill_diagonal(self.covariance, 0.1)
     
     def is_initialized(self) -> bool:
         """
@@ -5,9 +5,330 @@ This module provides the IMUProcessor class for IMU pre-integration between
 image frames in a Visual-Inertial Odometry system.
 """
 
+import math
 import numpy as np
-from scipy.spatial.transform import Rotation
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, TYPE_CHECKING
+
+from ._jit import njit, HAVE_NUMBA
+from ._rotation import rotation_cls
+
+if TYPE_CHECKING:
+    from scipy.spatial.transform import Rotation
+
+try:
+    from ._vio import ffi as _ffi, lib as _vio_lib
+except ImportError:
+    _vio_lib = None
+
+
+# Number of IMU steps above which the NumPy path composes orientations with a
+# log-depth prefix scan instead of a serial loop
+_SCAN_THRESHOLD = 512
+
+# Gather indices and signs that build Omega(p) from p = [x, y, z, w]
+_OMEGA_INDEX = np.array([[3, 2, 1, 0], [2, 3, 0, 1], [1, 0, 3, 2], [0, 1, 2, 3]])
+_OMEGA_SIGN = np.array([
+    [ 1.0,  1.0, -1.0, 1.0],
+    [-1.0,  1.0,  1.0, 1.0],
+    [ 1.0, -1.0,  1.0, 1.0],
+    [-1.0, -1.0, -1.0, 1.0],
+])
+
+
+def _sort_by_time(ts: np.ndarray, vals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sort samples by timestamp, skipping the sort when already in order.
+    """
+    if np.all(np.diff(ts) >= 0):
+        return ts, vals
+    order = np.argsort(ts, kind='stable')
+    return ts[order], vals[order]
+
+
+def _interp_rows(t: np.ndarray, ts: np.ndarray, vals: np.ndarray) -> np.ndarray:
+    """
+    Linearly interpolate (K, 3) samples taken at ``ts`` onto times ``t``.
+    """
+    out = np.empty((len(t), 3), dtype=vals.dtype)
+    for k in range(3):
+        out[:, k] = np.interp(t, ts, vals[:, k])
+    return out
+
+
+def _rotvec_to_quat(rotvecs: np.ndarray) -> np.ndarray:
+    """
+    Convert a stack of rotation vectors to unit quaternions [x, y, z, w].
+    
+    Uses sin(theta/2) / theta = 0.5 * sinc(theta / 2pi), which stays finite
+    for zero-length rotation vectors.
+    """
+    angles = np.linalg.norm(rotvecs, axis=1)
+    quats = np.empty((len(rotvecs), 4), dtype=rotvecs.dtype)
+    quats[:, :3] = rotvecs * (0.5 * np.sinc(angles / (2.0 * np.pi)))[:, None]
+    quats[:, 3] = np.cos(0.5 * angles)
+    return quats
+
+
+def _quat_multiply(q, p):
+    """
+    Hamilton product q * p of two quaternions [x, y, z, w].
+    
+    Operates on any 4-element sequences (plain floats avoid NumPy dispatch in
+    scalar loops) and returns a 4-tuple of the product components.
+    """
+    qx, qy, qz, qw = q
+    px, py, pz, pw = p
+    return (
+        qw * px + qx * pw + qy * pz - qz * py,
+        qw * py - qx * pz + qy * pw + qz * px,
+        qw * pz + qx * py - qy * px + qz * pw,
+        qw * pw - qx * px - qy * py - qz * pz,
+    )
+
+
+def _right_multiplication_matrices(quats: np.ndarray) -> np.ndarray:
+    """
+    Build the 4x4 matrices Omega(p) such that q * p = Omega(p) @ q.
+    
+    Quaternions use the scalar-last [x, y, z, w] convention of scipy.
+    """
+    return np.multiply(quats[:, _OMEGA_INDEX], _OMEGA_SIGN, dtype=quats.dtype)
+
+
+def _cumulative_quats(q0: np.ndarray, delta_quats: np.ndarray) -> np.ndarray:
+    """
+    Compute the running orientations q_k = q0 * p_1 * ... * p_k.
+    
+    Short sequences use a serial loop over the Hamilton product. Longer ones
+    use a Hillis-Steele prefix scan over the matrices Omega(p_k), so that each
+    of the log2(K) levels is a single batched np.matmul call.
+    
+    Parameters
+    ----------
+    q0 : np.ndarray
+        Initial quaternion [x, y, z, w].
+    delta_quats : np.ndarray
+        Incremental quaternions p_k, shape (K, 4).
+    
+    Returns
+    -------
+    np.ndarray
+        Running quaternions, shape (K, 4).
+    """
+    if len(delta_quats) <= _SCAN_THRESHOLD:
+        quats = np.empty_like(delta_quats)
+        q = tuple(q0.tolist())
+        for k, delta_q in enumerate(delta_quats.tolist()):
+            q = _quat_multiply(q, delta_q)
+            quats[k] = q
+        return quats
+    
+    # q_k = Omega(p_k) @ ... @ Omega(p_1) @ q0
+    products = _right_multiplication_matrices(delta_quats)
+    offset = 1
+    while offset < len(products):
+        products[offset:] = products[offset:] @ products[:-offset]
+        offset *= 2
+    return products @ q0
+
+
+def _rotate_vectors(quats: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """
+    Rotate each vector by the matching unit quaternion [x, y, z, w].
+    
+    Uses the two-cross-product form t = 2 (u x v), v' = v + w t + u x t,
+    which avoids building rotation matrices.
+    """
+    u = quats[:, :3]
+    t = 2.0 * np.cross(u, vectors)
+    return vectors + quats[:, 3:] * t + np.cross(u, t)
+
+
+def _preintegrate_numpy(
+    dt: np.ndarray,
+    gyro: np.ndarray,
+    accel: np.ndarray,
+    gyro_bias: np.ndarray,
+    accel_bias: np.ndarray,
+    gravity: np.ndarray,
+    q0: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Integrate IMU samples aligned on a common timeline using NumPy.
+    
+    Parameters
+    ----------
+    dt : np.ndarray
+        Time steps (K,) in seconds.
+    gyro : np.ndarray
+        Gyroscope readings (K, 3) at the start of each time step, in rad/s.
+    accel : np.ndarray
+        Accelerometer readings (K, 3) at the start of each time step, in m/s^2.
+    gyro_bias : np.ndarray
+        Gyroscope bias (3D vector, rad/s).
+    accel_bias : np.ndarray
+        Accelerometer bias (3D vector, m/s^2).
+    gravity : np.ndarray
+        Gravity vector in world frame (m/s^2).
+    q0 : np.ndarray
+        Initial orientation quaternion [x, y, z, w].
+    
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray]
+        Tuple of (delta_position, delta_velocity, orientation change relative
+        to ``q0`` as a quaternion [x, y, z, w]).
+    """
+    gyro_corrected = gyro - gyro_bias
+    accel_corrected = accel - accel_bias
+    
+    # Integrate rotation using the exponential map, starting from identity so
+    # that q_delta_k = p_1 * ... * p_k is already relative to q0
+    delta_quats = _rotvec_to_quat(gyro_corrected * dt[:, None])
+    identity = np.array([0.0, 0.0, 0.0, 1.0], dtype=delta_quats.dtype)
+    rel_quats = _cumulative_quats(identity, delta_quats)
+    
+    # World orientations q0 * q_delta_k, used only to rotate the accelerations
+    quats = np.stack(_quat_multiply(q0, rel_quats.T), axis=1)
+    
+    # Midpoint orientation of each step, normalize(q_{k-1} + q_k), which
+    # approximates slerp(q_{k-1}, q_k, 0.5) for small per-step rotations
+    mid_quats = quats.copy()
+    mid_quats[0] += q0
+    mid_quats[1:] += quats[:-1]
+    mid_quats /= np.linalg.norm(mid_quats, axis=1, keepdims=True)
+    
+    # Transform acceleration to world frame and subtract gravity
+    accel_world = _rotate_vectors(mid_quats, accel_corrected) - gravity
+    
+    # Integrate velocity
+    dv = accel_world * dt[:, None]
+    velocities = np.cumsum(dv, axis=0)
+    
+    # Integrate position from the velocity at the start of each step
+    velocities_prev = velocities - dv
+    delta_position = np.sum((velocities_prev + 0.5 * dv) * dt[:, None], axis=0)
+    
+    return delta_position, velocities[-1], rel_quats[-1]
+
+
+@njit(cache=True, fastmath=True)
+def _preintegrate_kernel(dt, gyro, accel, gyro_bias, accel_bias, gravity, q0):
+    """
+    Numba-compiled equivalent of ``_preintegrate_numpy``.
+    
+    Runs a scalar loop over the merged samples with the quaternion product
+    and the two-cross-product rotation written out by hand. The first call
+    compiles the kernel (about a second); ``cache=True`` persists the result
+    in ``__pycache__``.
+    
+    Inputs are float32, but every value is widened with ``np.float64`` as it
+    is read (Numba's ``float()`` keeps float32), so the arithmetic is double
+    precision like the native kernel.
+    """
+    f64 = np.float64
+    gbx, gby, gbz = f64(gyro_bias[0]), f64(gyro_bias[1]), f64(gyro_bias[2])
+    abx, aby, abz = f64(accel_bias[0]), f64(accel_bias[1]), f64(accel_bias[2])
+    gx, gy, gz = f64(gravity[0]), f64(gravity[1]), f64(gravity[2])
+    ax0, ay0, az0, aw0 = f64(q0[0]), f64(q0[1]), f64(q0[2]), f64(q0[3])
+    dx, dy, dz, dw = 0.0, 0.0, 0.0, 1.0
+    qx, qy, qz, qw = ax0, ay0, az0, aw0
+    delta_position = np.zeros(3)
+    delta_velocity = np.zeros(3)
+    
+    for k in range(dt.shape[0]):
+        h = f64(dt[k])
+        
+        # Incremental rotation exp(omega * dt) as a quaternion
+        rx = (f64(gyro[k, 0]) - gbx) * h
+        ry = (f64(gyro[k, 1]) - gby) * h
+        rz = (f64(gyro[k, 2]) - gbz) * h
+        angle = math.sqrt(rx * rx + ry * ry + rz * rz)
+        if angle < 1e-8:
+            s = 0.5 - angle * angle / 48.0
+        else:
+            s = math.sin(0.5 * angle) / angle
+        px, py, pz, pw = rx * s, ry * s, rz * s, math.cos(0.5 * angle)
+        
+        # q_delta = q_delta * p, the orientation change since q0
+        dx, dy, dz, dw = (
+            dw * px + dx * pw + dy * pz - dz * py,
+            dw * py - dx * pz + dy * pw + dz * px,
+            dw * pz + dx * py - dy * px + dz * pw,
+            dw * pw - dx * px - dy * py - dz * pz,
+        )
+        
+        # World orientation q = q0 * q_delta, keeping the previous one for
+        # the midpoint
+        mx, my, mz, mw = qx, qy, qz, qw
+        qx, qy, qz, qw = (
+            aw0 * dx + ax0 * dw + ay0 * dz - az0 * dy,
+            aw0 * dy - ax0 * dz + ay0 * dw + az0 * dx,
+            aw0 * dz + ax0 * dy - ay0 * dx + az0 * dw,
+            aw0 * dw - ax0 * dx - ay0 * dy - az0 * dz,
+        )
+        
+        # Midpoint orientation normalize(q_prev + q)
+        mx += qx
+        my += qy
+        mz += qz
+        mw += qw
+        inv_norm = 1.0 / math.sqrt(mx * mx + my * my + mz * mz + mw * mw)
+        mx *= inv_norm
+        my *= inv_norm
+        mz *= inv_norm
+        mw *= inv_norm
+        
+        # Rotate bias-corrected acceleration to world frame
+        vx = f64(accel[k, 0]) - abx
+        vy = f64(accel[k, 1]) - aby
+        vz = f64(accel[k, 2]) - abz
+        tx = 2.0 * (my * vz - mz * vy)
+        ty = 2.0 * (mz * vx - mx * vz)
+        tz = 2.0 * (mx * vy - my * vx)
+        ax = vx + mw * tx + (my * tz - mz * ty) - gx
+        ay = vy + mw * ty + (mz * tx - mx * tz) - gy
+        az = vz + mw * tz + (mx * ty - my * tx) - gz
+        
+        # Integrate position from the velocity at the start of the step
+        delta_position[0] += delta_velocity[0] * h + 0.5 * ax * h * h
+        delta_position[1] += delta_velocity[1] * h + 0.5 * ay * h * h
+        delta_position[2] += delta_velocity[2] * h + 0.5 * az * h * h
+        
+        # Integrate velocity
+        delta_velocity[0] += ax * h
+        delta_velocity[1] += ay * h
+        delta_velocity[2] += az * h
+    
+    quat = np.empty(4)
+    quat[0], quat[1], quat[2], quat[3] = dx, dy, dz, dw
+    return delta_position, delta_velocity, quat
+
+
+def _preintegrate_native(dt, gyro, accel, gyro_bias, accel_bias, gravity, q0):
+    """
+    Call the C implementation of ``_preintegrate_kernel`` in ``vio._vio``.
+    
+    Takes the same float32 arrays as the other integrators. The extension is
+    built from ``_vio.c`` by ``_vio_build.py`` and is only used when present.
+    """
+    inputs = [
+        np.ascontiguousarray(array, dtype=np.float32)
+        for array in (dt, gyro, accel, gyro_bias, accel_bias, gravity, q0)
+    ]
+    delta_position = np.empty(3)
+    delta_velocity = np.empty(3)
+    quat = np.empty(4)
+    
+    pointers = [_ffi.from_buffer("float[]", array) for array in inputs]
+    _vio_lib.preintegrate_batch(
+        pointers[0], pointers[1], pointers[2], len(inputs[0]),
+        pointers[3], pointers[4], pointers[5], pointers[6],
+        _ffi.from_buffer("double[]", delta_position),
+        _ffi.from_buffer("double[]", delta_velocity),
+        _ffi.from_buffer("double[]", quat),
+    )
+    return delta_position, delta_velocity, quat
 
 
 class IMUProcessor:
@@ -34,7 +355,7 @@ class IMUProcessor:
     accel_bias : np.ndarray
         Current accelerometer bias estimate (m/s^2).
     gravity : np.ndarray
-        Gravity vector in world frame (m/s^2).
+        Gravity vector in world frame (m/s^2), stored as float32.
     """
     
     def __init__(
@@ -46,7 +367,10 @@ class IMUProcessor:
         """Initialize the IMU processor with bias estimates."""
         self.gyro_bias = gyro_bias if gyro_bias is not None else np.zeros(3)
         self.accel_bias = accel_bias if accel_bias is not None else np.zeros(3)
-        self.gravity = gravity if gravity is not None else np.array([0.0, 0.0, -9.81])
+        self.gravity = np.asarray(
+            gravity if gravity is not None else [0.0, 0.0, -9.81],
+            dtype=np.float32
+        )
         
         # Integration state
         self.reset_integration()
@@ -55,15 +379,17 @@ class IMUProcessor:
         """Reset the pre-integration state."""
         self.delta_position = np.zeros(3)
         self.delta_velocity = np.zeros(3)
-        self.delta_rotation = Rotation.identity()
+        self.delta_quat = np.array([0.0, 0.0, 0.0, 1.0])
         self.dt_total = 0.0
     
     def preintegrate(
         self,
-        gyro_measurements: List[Tuple[float, np.ndarray]],
-        accel_measurements: List[Tuple[float, np.ndarray]],
-        initial_rotation: Optional[Rotation] = None
-    ) -> Tuple[np.ndarray, np.ndarray, Rotation]:
+        gyro_ts: np.ndarray,
+        gyro_vals: np.ndarray,
+        accel_ts: np.ndarray,
+        accel_vals: np.ndarray,
+        initial_quat: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Perform IMU pre-integration between two image frames.
         
@@ -73,101 +399,150 @@ class IMUProcessor:
         
         Parameters
         ----------
-        gyro_measurements : List[Tuple[float, np.ndarray]]
-            List of (timestamp, gyroscope_reading) tuples.
-            Gyroscope readings in rad/s (3D vector).
-        accel_measurements : List[Tuple[float, np.ndarray]]
-            List of (timestamp, accelerometer_reading) tuples.
-            Accelerometer readings in m/s^2 (3D vector).
-        initial_rotation : Rotation, optional
-            Initial orientation for the integration period.
+        gyro_ts : np.ndarray
+            Gyroscope timestamps (K,) in seconds.
+        gyro_vals : np.ndarray
+            Gyroscope readings (K, 3) in rad/s.
+        accel_ts : np.ndarray
+            Accelerometer timestamps (M,) in seconds.
+        accel_vals : np.ndarray
+            Accelerometer readings (M, 3) in m/s^2.
+        initial_quat : np.ndarray, optional
+            Initial orientation for the integration period as a quaternion
+            [x, y, z, w] (scalar-last, as returned by scipy's ``as_quat()``).
             If None, uses identity (world frame aligned with body frame).
         
         Returns
         -------
-        Tuple[np.ndarray, np.ndarray, Rotation]
+        Tuple[np.ndarray, np.ndarray, np.ndarray]
             Tuple containing:
             - delta_position: 3D position change (meters)
             - delta_velocity: 3D velocity change (m/s)
-            - delta_rotation: Rotation object representing orientation change
+            - delta_quat: Orientation change as a quaternion [x, y, z, w]
         
         Notes
         -----
         This is a simplified pre-integration that assumes:
         1. Linear interpolation between IMU samples
         2. Constant bias during the integration period
-        3. Small rotation angles for linearization
+        3. Constant angular velocity within each time step
+        
+        Accelerations are rotated by the midpoint orientation of each step,
+        which makes the velocity integration second-order accurate in the
+        rotation without extra sub-steps.
+        
+        The gyroscope and accelerometer streams are merged onto a common
+        timeline and integrated as stacked arrays; only the orientation
+        composition is sequential.
+        
+        Samples are expected in timestamp order, as streamed by IMU drivers;
+        in that case the inputs are used as-is. Out-of-order streams are
+        detected and sorted with a stable argsort.
+        
+        Callers holding lists of (timestamp, reading) tuples can convert them
+        with ``measurements_to_arrays``.
         
         For production systems, consider using more sophisticated methods like
         the Forster et al. (2017) pre-integration framework.
         """
         self.reset_integration()
         
-        if initial_rotation is None:
-            initial_rotation = Rotation.identity()
+        if initial_quat is None:
+            initial_quat = np.array([0.0, 0.0, 0.0, 1.0])
+        initial_quat = np.asarray(initial_quat, dtype=np.float64)
         
-        current_rotation = initial_rotation
+        # Readings are integrated in float32, which matches IMU sensor
+        # precision; timestamps stay float64 so absolute times are exact
+        gyro_ts = np.asarray(gyro_ts, dtype=np.float64)
+        gyro_vals = np.asarray(gyro_vals, dtype=np.float32).reshape(-1, 3)
+        accel_ts = np.asarray(accel_ts, dtype=np.float64)
+        accel_vals = np.asarray(accel_vals, dtype=np.float32).reshape(-1, 3)
         
-        # Sort measurements by timestamp
-        gyro_measurements = sorted(gyro_measurements, key=lambda x: x[0])
-        accel_measurements = sorted(accel_measurements, key=lambda x: x[0])
+        # Sort measurements by timestamp (no-op for in-order streams)
+        gyro_ts, gyro_vals = _sort_by_time(gyro_ts, gyro_vals)
+        accel_ts, accel_vals = _sort_by_time(accel_ts, accel_vals)
         
-        # Interpolate and integrate
-        gyro_idx = 0
-        accel_idx = 0
+        if len(gyro_ts) < 2 or len(accel_ts) < 2:
+            return self.delta_position, self.delta_velocity, self.delta_quat
         
-        while gyro_idx < len(gyro_measurements) - 1 and accel_idx < len(accel_measurements) - 1:
-            # Get current measurements
-            t_gyro, gyro = gyro_measurements[gyro_idx]
-            t_accel, accel = accel_measurements[accel_idx]
-            
-            # Determine next timestamp
-            t_gyro_next = gyro_measurements[gyro_idx + 1][0]
-            t_accel_next = accel_measurements[accel_idx + 1][0]
-            t_next = min(t_gyro_next, t_accel_next)
-            
-            # Time step
-            dt = t_next - min(t_gyro, t_accel)
-            
-            if dt <= 0:
-                # Skip invalid time steps
-                if t_gyro_next <= t_accel_next:
-                    gyro_idx += 1
-                else:
-                    accel_idx += 1
-                continue
-            
-            # Apply bias correction
-            gyro_corrected = gyro - self.gyro_bias
-            accel_corrected = accel - self.accel_bias
-            
-            # Integrate rotation (using small angle approximation)
-            # For better accuracy, use exponential map: exp(omega * dt)
-            delta_angle = gyro_corrected * dt
-            delta_rot = Rotation.from_rotvec(delta_angle)
-            current_rotation = current_rotation * delta_rot
-            
-            # Transform acceleration to world frame and subtract gravity
-            accel_world = current_rotation.apply(accel_corrected) - self.gravity
-            
-            # Integrate velocity
-            self.delta_velocity += accel_world * dt
-            
-            # Integrate position (using midpoint method for better accuracy)
-            self.delta_position += self.delta_velocity * dt + 0.5 * accel_world * dt * dt
-            
-            self.dt_total += dt
-            
-            # Move to next measurements
-            if t_gyro_next <= t_accel_next:
-                gyro_idx += 1
-            else:
-                accel_idx += 1
+        # Merge both streams onto a common timeline covering their overlap
+        timeline = np.union1d(gyro_ts, accel_ts)
+        t_start = max(gyro_ts[0], accel_ts[0])
+        t_end = min(gyro_ts[-1], accel_ts[-1])
+        timeline = timeline[(timeline >= t_start) & (timeline <= t_end)]
+        
+        if len(timeline) < 2:
+            return self.delta_position, self.delta_velocity, self.delta_quat
+        
+        # Time steps (strictly positive since the timeline is unique and sorted)
+        dt = np.diff(timeline).astype(np.float32)
+        
+        # Interpolate both streams at the start of every time step
+        gyro_interp = _interp_rows(timeline[:-1], gyro_ts, gyro_vals)
+        accel_interp = _interp_rows(timeline[:-1], accel_ts, accel_vals)
         
-        # Store final rotation change
-        self.delta_rotation = initial_rotation.inv() * current_rotation
+        # Integrate with the native extension if it has been built, then the
+        # Numba kernel, then plain NumPy
+        if _vio_lib is not None:
+            integrate = _preintegrate_native
+        elif HAVE_NUMBA:
+            integrate = _preintegrate_kernel
+        else:
+            integrate = _preintegrate_numpy
+        delta_position, delta_velocity, q = integrate(
+            dt,
+            gyro_interp,
+            accel_interp,
+            np.asarray(self.gyro_bias, dtype=np.float32),
+            np.asarray(self.accel_bias, dtype=np.float32),
+            self.gravity,
+            initial_quat.astype(np.float32)
+        )
         
-        return self.delta_position, self.delta_velocity, self.delta_rotation
+        # Hand float64 results to the EKF
+        self.delta_position = np.asarray(delta_position, dtype=np.float64)
+        self.delta_velocity = np.asarray(delta_velocity, dtype=np.float64)
+        
+        self.dt_total = timeline[-1] - timeline[0]
+        
+        # The integrator accumulates the rotation change directly
+        self.delta_quat = np.asarray(q, dtype=np.float64)
+        self.delta_quat /= np.linalg.norm(self.delta_quat)
+        
+        return self.delta_position, self.delta_velocity, self.delta_quat
+    
+    def preintegrate_rot(
+        self,
+        gyro_ts: np.ndarray,
+        gyro_vals: np.ndarray,
+        accel_ts: np.ndarray,
+        accel_vals: np.ndarray,
+        initial_rotation: Optional['Rotation'] = None
+    ) -> Tuple[np.ndarray, np.ndarray, 'Rotation']:
+        """
+        Perform IMU pre-integration using scipy Rotation objects.
+        
+        Compatibility wrapper around ``preintegrate`` for callers that hold
+        orientations as ``Rotation`` objects.
+        
+        Parameters
+        ----------
+        gyro_ts, gyro_vals, accel_ts, accel_vals : np.ndarray
+            IMU measurement arrays, as for ``preintegrate``.
+        initial_rotation : Rotation, optional
+            Initial orientation for the integration period.
+            If None, uses identity.
+        
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray, Rotation]
+            Tuple of (delta_position, delta_velocity, delta_rotation).
+        """
+        initial_quat = None if initial_rotation is None else initial_rotation.as_quat()
+        delta_pos, delta_vel, delta_quat = self.preintegrate(
+            gyro_ts, gyro_vals, accel_ts, accel_vals, initial_quat=initial_quat
+        )
+        return delta_pos, delta_vel, rotation_cls().from_quat(delta_quat)
     
     def update_bias(self, gyro_bias: np.ndarray, accel_bias: np.ndarray):
         """
@@ -194,12 +569,34 @@ class IMUProcessor:
         """
         return self.gyro_bias.copy(), self.accel_bias.copy()
     
+    @staticmethod
+    def measurements_to_arrays(
+        measurements: List[Tuple[float, np.ndarray]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convert a list of (timestamp, reading) tuples to stacked arrays.
+        
+        Parameters
+        ----------
+        measurements : List[Tuple[float, np.ndarray]]
+            List of (timestamp, 3D reading) tuples.
+        
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Tuple of (timestamps, values) with shapes (K,) and (K, 3), as
+            accepted by ``preintegrate``.
+        """
+        timestamps = np.array([t for t, _ in measurements], dtype=np.float64)
+        values = np.array([v for _, v in measurements], dtype=np.float64).reshape(-1, 3)
+        return timestamps, values
+    
     @staticmethod
     def simulate_imu_data(
         duration: float,
         frequency: float = 200.0,
         motion_type: str = 'stationary'
-    ) -> Tuple[List[Tuple[float, np.ndarray]], List[Tuple[float, np.ndarray]]]:
+    ) -> Tuple[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]:
         """
         Generate simulated IMU data for testing.
         
@@ -217,54 +614,49 @@ class IMUProcessor:
         
         Returns
         -------
-        Tuple[List[Tuple[float, np.ndarray]], List[Tuple[float, np.ndarray]]]
-            Tuple of (gyro_measurements, accel_measurements).
+        Tuple[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+            Tuple of ((timestamps, gyro), (timestamps, accel)), where
+            timestamps has shape (K,) and the readings have shape (K, 3).
         """
         dt = 1.0 / frequency
         timestamps = np.arange(0, duration, dt)
-        
-        gyro_measurements = []
-        accel_measurements = []
+        num_samples = len(timestamps)
         
         # Noise parameters
         gyro_noise_std = 0.01  # rad/s
         accel_noise_std = 0.1  # m/s^2
         
-        for t in timestamps:
-            if motion_type == 'stationary':
-                # Only noise and gravity
-                gyro = np.random.randn(3) * gyro_noise_std
-                accel = np.array([0, 0, 9.81]) + np.random.randn(3) * accel_noise_std
-            
-            elif motion_type == 'linear':
-                # Constant velocity in x direction
-                gyro = np.random.randn(3) * gyro_noise_std
-                accel = np.array([0.5, 0, 9.81]) + np.random.randn(3) * accel_noise_std
-            
-            elif motion_type == 'circular':
-                # Circular motion in XY plane
-                omega = 0.5  # rad/s
-                radius = 1.0  # meters
-                
-                # Angular velocity (constant around Z axis)
-                gyro = np.array([0, 0, omega]) + np.random.randn(3) * gyro_noise_std
-                
-                # Centripetal acceleration
-                centripetal = omega**2 * radius
-                angle = omega * t
-                accel = np.array([
-                    -centripetal * np.cos(angle),
-                    -centripetal * np.sin(angle),
-                    9.81
-                ]) + np.random.randn(3) * accel_noise_std
+        rng = np.random.default_rng()
+        gyro = rng.standard_normal((num_samples, 3)) * gyro_noise_std
+        accel = rng.standard_normal((num_samples, 3)) * accel_noise_std
+        accel[:, 2] += 9.81
+        
+        if motion_type == 'stationary':
+            # Only noise and gravity
+            pass
+        
+        elif motion_type == 'linear':
+            # Constant velocity in x direction
+            accel[:, 0] += 0.5
+        
+        elif motion_type == 'circular':
+            # Circular motion in XY plane
+            omega = 0.5  # rad/s
+            radius = 1.0  # meters
             
-            else:
-                raise ValueError(f"Unknown motion type: {motion_type}")
+            # Angular velocity (constant around Z axis)
+            gyro[:, 2] += omega
             
-            gyro_measurements.append((t, gyro))
-            accel_measurements.append((t, accel))
+            # Centripetal acceleration
+            centripetal = omega**2 * radius
+            angle = omega * timestamps
+            accel[:, 0] -= centripetal * np.cos(angle)
+            accel[:, 1] -= centripetal * np.sin(angle)
+        
+        else:
+            raise ValueError(f"Unknown motion type: {motion_type}")
         
-        return gyro_measurements, accel_measurements
+        return (timestamps, gyro), (timestamps, accel)
     
     def get_integration_info(self) -> dict:
         """
@@ -276,12 +668,12 @@ class IMUProcessor:
             Dictionary containing:
             - 'delta_position': Position change (meters)
             - 'delta_velocity': Velocity change (m/s)
-            - 'delta_rotation': Rotation change (as quaternion)
+            - 'delta_rotation': Rotation change (as quaternion [x, y, z, w])
             - 'total_time': Total integration time (seconds)
         """
         return {
             'delta_position': self.delta_position.copy(),
             'delta_velocity': self.delta_velocity.copy(),
-            'delta_rotation': self.delta_rotation.as_quat(),
+            'delta_rotation': self.delta_quat.copy(),
             'total_time': self.dt_total
         }